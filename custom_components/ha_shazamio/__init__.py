@@ -1,14 +1,40 @@
 """The ShazamIO integration."""
+from datetime import timedelta
 import logging
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
+from .api import ShazamIOAddonClient
+from .const import (
+    DOMAIN,
+    CONF_CONNECTION_LIMIT,
+    CONF_KEEPALIVE_TIMEOUT,
+    CONF_REQUEST_TIMEOUT,
+    CONF_RECOGNIZE_TIMEOUT,
+    CONF_CHARTS,
+    CONF_CHART_REFRESH_INTERVAL,
+    CONF_EVENT_MODE,
+    CONF_SHARED_PATHS,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_RECOGNIZE_TIMEOUT,
+    DEFAULT_CHARTS,
+    DEFAULT_CHART_REFRESH_INTERVAL,
+    DEFAULT_EVENT_MODE,
+    DEFAULT_SHARED_PATHS,
+    SERVICE_RECOGNIZE,
+)
+from .events import ResponseEvents
+from .coordinator import ShazamIODataUpdateCoordinator, parse_charts
 from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = [Platform.SENSOR]
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the ShazamIO component."""
@@ -19,7 +45,39 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up ShazamIO from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {}
+
+    options = entry.options
+    client = ShazamIOAddonClient(
+        connection_limit=options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+        keepalive_timeout=options.get(CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT),
+        request_timeout=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+        endpoint_timeouts={
+            SERVICE_RECOGNIZE: options.get(CONF_RECOGNIZE_TIMEOUT, DEFAULT_RECOGNIZE_TIMEOUT),
+        },
+    )
+    await client.async_start()
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "client": client,
+        "events": ResponseEvents(hass, options.get(CONF_EVENT_MODE, DEFAULT_EVENT_MODE)),
+        "shared_paths": options.get(CONF_SHARED_PATHS, DEFAULT_SHARED_PATHS),
+    }
+
+    charts = parse_charts(options.get(CONF_CHARTS, DEFAULT_CHARTS))
+    if charts:
+        coordinator = ShazamIODataUpdateCoordinator(
+            hass,
+            client,
+            charts,
+            timedelta(minutes=options.get(CONF_CHART_REFRESH_INTERVAL, DEFAULT_CHART_REFRESH_INTERVAL)),
+        )
+        hass.data[DOMAIN][entry.entry_id]["coordinator"] = coordinator
+        # Warm the charts without holding up setup if the add-on is slow
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN}_chart_refresh")
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     # Set up services
     await async_setup_services(hass)
@@ -29,12 +87,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    hass.data[DOMAIN].pop(entry.entry_id)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await entry_data["client"].async_close()
+
+    return unload_ok
 
-    return True
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle removal of an entry."""
     pass
-
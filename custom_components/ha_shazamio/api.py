@@ -0,0 +1,165 @@
+"""Pooled HTTP client for the ShazamIO add-on API."""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, BinaryIO, Collection, Dict, Optional
+
+import aiohttp
+
+from .const import (
+    ADDON_URL,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ShazamIOAddonClient:
+    """Long-lived client that keeps connections to the add-on alive between calls."""
+
+    def __init__(
+        self,
+        base_url: str = ADDON_URL,
+        connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        endpoint_timeouts: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """Initialize the client."""
+        self._base_url = base_url
+        self._connection_limit = connection_limit
+        self._keepalive_timeout = keepalive_timeout
+        self._request_timeout = request_timeout
+        self._endpoint_timeouts = endpoint_timeouts or {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "errors": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+        }
+
+    async def async_start(self) -> None:
+        """Open the pooled session."""
+        if self._session is not None and not self._session.closed:
+            return
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+
+        connector = aiohttp.TCPConnector(
+            limit=self._connection_limit,
+            keepalive_timeout=self._keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[trace_config],
+        )
+
+    async def async_close(self) -> None:
+        """Close the pooled session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        _LOGGER.debug("Closed add-on client, stats: %s", self.stats)
+
+    async def _on_connection_create(self, session, context, params) -> None:
+        self.stats["connections_created"] += 1
+
+    async def _on_connection_reuse(self, session, context, params) -> None:
+        self.stats["connections_reused"] += 1
+
+    def _timeout_for(self, endpoint: str) -> aiohttp.ClientTimeout:
+        """Return the timeout configured for an endpoint."""
+        # Sub-routes such as "recognize/stream" and batch variants such as
+        # "recognize_batch" share their parent's timeout
+        base_endpoint = endpoint.split("/", 1)[0].removesuffix("_batch")
+        return aiohttp.ClientTimeout(
+            total=self._endpoint_timeouts.get(base_endpoint, self._request_timeout)
+        )
+
+    async def async_post(
+        self, endpoint: str, data: Dict[str, Any], expected_statuses: Collection[int] = ()
+    ) -> Any:
+        """POST JSON to an add-on endpoint and return the decoded response.
+
+        Error responses with a status in expected_statuses are raised without
+        being logged as errors, for callers that handle them.
+        """
+        return await self._async_request(endpoint, expected_statuses=expected_statuses, json=data)
+
+    async def async_post_stream(
+        self, endpoint: str, body: BinaryIO, params: Dict[str, str]
+    ) -> Any:
+        """POST a binary file object to an add-on endpoint.
+
+        aiohttp sends file objects in chunks, so the body is never held in
+        memory as a whole (or base64-encoded) on this side.
+        """
+        return await self._async_request(
+            endpoint,
+            data=body,
+            params=params,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+    async def async_post_lines(
+        self, endpoint: str, data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """POST JSON to an add-on endpoint that streams NDJSON, yielding each line.
+
+        The endpoint timeout bounds the wait between lines rather than the
+        whole response, since streamed responses can run for a long time.
+        """
+        await self.async_start()
+        url = f"{self._base_url}/{endpoint}"
+        self.stats["requests"] += 1
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=self._timeout_for(endpoint).total)
+
+        try:
+            async with self._session.post(url, json=data, timeout=timeout) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    if line.strip():
+                        yield json.loads(line)
+        except aiohttp.ClientError as err:
+            self.stats["errors"] += 1
+            _LOGGER.error(f"Error calling add-on API {endpoint}: {err}")
+            raise
+        except asyncio.TimeoutError:
+            self.stats["errors"] += 1
+            _LOGGER.error(f"Timeout calling add-on API {endpoint}")
+            raise
+
+    async def _async_request(
+        self, endpoint: str, expected_statuses: Collection[int] = (), **kwargs: Any
+    ) -> Any:
+        """POST to an add-on endpoint and return the decoded JSON response."""
+        await self.async_start()
+        url = f"{self._base_url}/{endpoint}"
+        self.stats["requests"] += 1
+
+        try:
+            async with self._session.post(
+                url, timeout=self._timeout_for(endpoint), **kwargs
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+        except aiohttp.ClientResponseError as err:
+            if err.status in expected_statuses:
+                _LOGGER.debug(f"Add-on API {endpoint} answered {err.status}: {err.message}")
+                raise
+            self.stats["errors"] += 1
+            _LOGGER.error(f"Error calling add-on API {endpoint}: {err}")
+            raise
+        except aiohttp.ClientError as err:
+            self.stats["errors"] += 1
+            _LOGGER.error(f"Error calling add-on API {endpoint}: {err}")
+            raise
+        except asyncio.TimeoutError:
+            self.stats["errors"] += 1
+            _LOGGER.error(f"Timeout calling add-on API {endpoint}")
+            raise
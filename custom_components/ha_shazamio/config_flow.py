@@ -5,10 +5,30 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_CONNECTION_LIMIT,
+    CONF_KEEPALIVE_TIMEOUT,
+    CONF_REQUEST_TIMEOUT,
+    CONF_RECOGNIZE_TIMEOUT,
+    CONF_CHARTS,
+    CONF_CHART_REFRESH_INTERVAL,
+    CONF_EVENT_MODE,
+    CONF_SHARED_PATHS,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_RECOGNIZE_TIMEOUT,
+    DEFAULT_CHARTS,
+    DEFAULT_CHART_REFRESH_INTERVAL,
+    DEFAULT_EVENT_MODE,
+    DEFAULT_SHARED_PATHS,
+    EVENT_MODES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,6 +38,14 @@ class ShazamIOConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return ShazamIOOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -40,3 +68,61 @@ class ShazamIOConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
+
+
+class ShazamIOOptionsFlow(config_entries.OptionsFlow):
+    """Handle ShazamIO options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the add-on connection, chart and event options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_CONNECTION_LIMIT,
+                        default=options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Optional(
+                        CONF_KEEPALIVE_TIMEOUT,
+                        default=options.get(CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                    vol.Optional(
+                        CONF_REQUEST_TIMEOUT,
+                        default=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                    vol.Optional(
+                        CONF_RECOGNIZE_TIMEOUT,
+                        default=options.get(CONF_RECOGNIZE_TIMEOUT, DEFAULT_RECOGNIZE_TIMEOUT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                    vol.Optional(
+                        CONF_CHARTS,
+                        default=options.get(CONF_CHARTS, DEFAULT_CHARTS),
+                    ): selector.TextSelector(selector.TextSelectorConfig(multiline=True)),
+                    vol.Optional(
+                        CONF_CHART_REFRESH_INTERVAL,
+                        default=options.get(CONF_CHART_REFRESH_INTERVAL, DEFAULT_CHART_REFRESH_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=1440)),
+                    vol.Optional(
+                        CONF_EVENT_MODE,
+                        default=options.get(CONF_EVENT_MODE, DEFAULT_EVENT_MODE),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(options=EVENT_MODES, translation_key=CONF_EVENT_MODE)
+                    ),
+                    vol.Optional(
+                        CONF_SHARED_PATHS,
+                        default=options.get(CONF_SHARED_PATHS, DEFAULT_SHARED_PATHS),
+                    ): bool,
+                }
+            ),
+        )
@@ -4,6 +4,7 @@ DOMAIN = "ha_shazamio"
 
 # Service names
 SERVICE_RECOGNIZE = "recognize"
+SERVICE_RECOGNIZE_BATCH = "recognize_batch"
 SERVICE_ARTIST_ABOUT = "artist_about"
 SERVICE_TRACK_ABOUT = "track_about"
 SERVICE_SEARCH_ARTIST = "search_artist"
@@ -18,7 +19,75 @@ SERVICE_ARTIST_ALBUMS = "artist_albums"
 SERVICE_SEARCH_ALBUM = "search_album"
 SERVICE_LISTENING_COUNTER = "listening_counter"
 SERVICE_LISTENING_COUNTER_MANY = "listening_counter_many"
+SERVICE_START_LISTENING = "start_listening"
+SERVICE_STOP_LISTENING = "stop_listening"
+SERVICE_HISTORY = "history"
+SERVICE_HISTORY_TOP_ARTISTS = "history_top_artists"
+SERVICE_HISTORY_PLAY_COUNTS = "history_play_counts"
+SERVICE_GET_RESULT = "get_result"
+
+# Upper bound on track IDs per listening_counter_many call (matches the add-on)
+MAX_LISTENING_COUNTER_IDS = 1000
+
+# hass.data key of the compiled template cache shared by all service calls
+DATA_TEMPLATE_CACHE = f"{DOMAIN}_templates"
+
+# Compiled templates kept for service parameters
+TEMPLATE_CACHE_SIZE = 128
 
 # Event types
 EVENT_SHAZAMIO_RESPONSE = f"{DOMAIN}_response"
 
+
+# Add-on API
+ADDON_URL = "http://localhost:8099/api"
+
+# Connection pool options
+CONF_CONNECTION_LIMIT = "connection_limit"
+CONF_KEEPALIVE_TIMEOUT = "keepalive_timeout"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_RECOGNIZE_TIMEOUT = "recognize_timeout"
+
+DEFAULT_CONNECTION_LIMIT = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+DEFAULT_REQUEST_TIMEOUT = 60
+DEFAULT_RECOGNIZE_TIMEOUT = 120
+
+# Chart warming options
+CONF_CHARTS = "charts"
+CONF_CHART_REFRESH_INTERVAL = "chart_refresh_interval"
+
+DEFAULT_CHARTS = ""
+DEFAULT_CHART_REFRESH_INTERVAL = 30  # minutes
+
+# Chart endpoints the coordinator can keep warm: positional parameters of a
+# chart line ("top_city_tracks:US:New York") and the service's default limit
+CHART_ENDPOINTS = {
+    SERVICE_TOP_WORLD_TRACKS: ((), 200),
+    SERVICE_TOP_COUNTRY_TRACKS: (("country_code",), 200),
+    SERVICE_TOP_CITY_TRACKS: (("country_code", "city_name"), 200),
+    SERVICE_TOP_WORLD_GENRE_TRACKS: (("genre",), 100),
+    SERVICE_TOP_COUNTRY_GENRE_TRACKS: (("country_code", "genre"), 200),
+}
+
+# Response event options: fire the full result, a summary with a result ID
+# (full result fetched with the get_result service), or nothing
+CONF_EVENT_MODE = "event_mode"
+
+EVENT_MODE_FULL = "full"
+EVENT_MODE_SUMMARY = "summary"
+EVENT_MODE_OFF = "off"
+EVENT_MODES = [EVENT_MODE_FULL, EVENT_MODE_SUMMARY, EVENT_MODE_OFF]
+
+DEFAULT_EVENT_MODE = EVENT_MODE_FULL
+
+# Summarized results kept for get_result
+RESULT_CACHE_SIZE = 20
+
+# Shared-path mode: audio files under these folders are recognized by path,
+# since the add-on has them mapped at the same location (its config.json
+# "map"), instead of being uploaded to the add-on
+CONF_SHARED_PATHS = "shared_paths"
+
+DEFAULT_SHARED_PATHS = True
+SHARED_PATH_ROOTS = ("/media/", "/share/")
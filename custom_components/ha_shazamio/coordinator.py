@@ -1,30 +1,106 @@
 """DataUpdateCoordinator for ShazamIO integration."""
+import asyncio
 from datetime import timedelta
+import json
 import logging
+from typing import Any
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .api import ShazamIOAddonClient
+from .const import CHART_ENDPOINTS, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def chart_key(endpoint: str, payload: dict[str, Any]) -> str:
+    """Return the key identifying a chart request, independent of parameter order."""
+    return f"{endpoint}:{json.dumps(payload, sort_keys=True)}"
+
+
+def parse_charts(value: str) -> list[tuple[str, dict[str, Any]]]:
+    """Parse the charts option into (endpoint, payload) pairs.
+
+    One chart per line, as the endpoint followed by its parameters separated
+    by colons, e.g. "top_country_genre_tracks:US:POP". Payloads use the same
+    defaults as the matching service so default service calls hit the warm copy.
+    """
+    charts = []
+    for line in (value or "").splitlines():
+        parts = [part.strip() for part in line.split(":")]
+        if not parts[0]:
+            continue
+        endpoint, args = parts[0], parts[1:]
+        if endpoint not in CHART_ENDPOINTS:
+            _LOGGER.warning("Ignoring unknown chart %s", endpoint)
+            continue
+        params, limit = CHART_ENDPOINTS[endpoint]
+        if len(args) != len(params):
+            _LOGGER.warning("Chart %s needs parameters %s, got %s", endpoint, ", ".join(params) or "none", line)
+            continue
+        payload = dict(zip(params, args))
+        payload.update({"limit": limit, "offset": 0, "language": "en-US", "endpoint_country": "GB"})
+        charts.append((endpoint, payload))
+    return charts
+
+
 class ShazamIODataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from ShazamIO API."""
+    """Keep a configured set of charts warm in memory.
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    Each refresh fetches every chart; a chart whose refresh fails keeps its
+    last good data (marked stale) so service calls and sensors never wait
+    on or fail against upstream once it has been fetched once.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: ShazamIOAddonClient,
+        charts: list[tuple[str, dict[str, Any]]],
+        update_interval: timedelta,
+    ) -> None:
         """Initialize."""
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=30),
+            update_interval=update_interval,
+        )
+        self.client = client
+        self.charts = {chart_key(endpoint, payload): (endpoint, payload) for endpoint, payload in charts}
+        self.hits = 0
+
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Refresh all charts, keeping the previous data for any that fail."""
+        previous = self.data or {}
+        keys = list(self.charts)
+        results = await asyncio.gather(
+            *(self.client.async_post(*self.charts[key]) for key in keys),
+            return_exceptions=True,
         )
 
-    async def _async_update_data(self):
-        """Update data via library."""
-        # This coordinator is a placeholder for future features that may need polling
-        # Currently, all ShazamIO operations are triggered via services
-        return {}
+        data: dict[str, dict[str, Any]] = {}
+        failures = 0
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                failures += 1
+                _LOGGER.warning("Refreshing chart %s failed: %s", key, result)
+                entry = dict(previous.get(key, {"data": None, "fetched_at": None}))
+                entry.update({"stale": True, "error": str(result)})
+            else:
+                entry = {"data": result, "fetched_at": dt_util.utcnow(), "stale": False, "error": None}
+            data[key] = entry
+
+        if keys and failures == len(keys) and not any(entry["data"] is not None for entry in data.values()):
+            raise UpdateFailed("Could not fetch any chart from the add-on")
+        return data
 
+    def get_chart(self, endpoint: str, payload: dict[str, Any]) -> dict[str, Any] | None:
+        """Return the in-memory copy of a chart, stale or not, if it is kept warm."""
+        entry = (self.data or {}).get(chart_key(endpoint, payload))
+        if entry is None or entry["data"] is None:
+            return None
+        self.hits += 1
+        return entry["data"]
@@ -0,0 +1,28 @@
+"""Diagnostics support for ShazamIO."""
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_TEMPLATE_CACHE
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    client = entry_data.get("client")
+    coordinator = entry_data.get("coordinator")
+    template_cache = hass.data.get(DATA_TEMPLATE_CACHE)
+
+    return {
+        "options": dict(entry.options),
+        "client": dict(client.stats) if client is not None else None,
+        "templates": template_cache.stats() if template_cache is not None else None,
+        "charts": {
+            "hits": coordinator.hits,
+            "charts": {
+                key: {"fetched_at": chart["fetched_at"], "stale": chart["stale"], "error": chart["error"]}
+                for key, chart in (coordinator.data or {}).items()
+            },
+        } if coordinator is not None else None,
+    }
@@ -0,0 +1,82 @@
+"""Response events for ShazamIO service calls.
+
+Every service call can fire a ha_shazamio_response event with its result.
+Full chart and search results are large, and each event is written to the
+recorder and sent to every websocket subscriber, so the event can instead
+carry a compact summary and a result ID (the full result is kept in a small
+in-memory cache for the get_result service), or be skipped entirely.
+"""
+from collections import OrderedDict
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.ulid import ulid_now
+
+from .const import (
+    EVENT_MODE_FULL,
+    EVENT_MODE_OFF,
+    EVENT_MODE_SUMMARY,
+    EVENT_SHAZAMIO_RESPONSE,
+    RESULT_CACHE_SIZE,
+)
+
+
+def summarize(result: Any) -> dict[str, Any]:
+    """Return a small description of a result: the matched track (or why the music gate skipped it) and item counts."""
+    summary: dict[str, Any] = {}
+    if not isinstance(result, dict):
+        return summary
+    track = result.get("track")
+    if isinstance(track, dict):
+        summary["track"] = {
+            "key": track.get("key"),
+            "title": track.get("title"),
+            "subtitle": track.get("subtitle"),
+        }
+    if result.get("no_music"):
+        summary["no_music"] = result.get("reason")
+    # Item counts of the top-level lists, and of lists one level down
+    # (e.g. search results under tracks.hits)
+    counts = {}
+    for key, value in result.items():
+        if isinstance(value, list):
+            counts[key] = len(value)
+        elif isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                if isinstance(inner_value, list):
+                    counts[f"{key}.{inner_key}"] = len(inner_value)
+    if counts:
+        summary["counts"] = counts
+    return summary
+
+
+class ResponseEvents:
+    """Fires response events in the configured mode and keeps summarized results."""
+
+    def __init__(self, hass: HomeAssistant, mode: str = EVENT_MODE_FULL, cache_size: int = RESULT_CACHE_SIZE) -> None:
+        self._hass = hass
+        self.mode = mode
+        self._cache_size = cache_size
+        self._results: OrderedDict[str, Any] = OrderedDict()
+
+    def fire(self, service: str, result: Any, mode: str | None = None) -> None:
+        """Fire the response event for a result, in the call's mode or the configured one."""
+        mode = mode or self.mode
+        if mode == EVENT_MODE_OFF:
+            return
+        if mode != EVENT_MODE_SUMMARY:
+            self._hass.bus.async_fire(EVENT_SHAZAMIO_RESPONSE, {"service": service, "data": result})
+            return
+
+        result_id = ulid_now()
+        self._results[result_id] = result
+        while len(self._results) > self._cache_size:
+            self._results.popitem(last=False)
+        self._hass.bus.async_fire(
+            EVENT_SHAZAMIO_RESPONSE,
+            {"service": service, "result_id": result_id, "summary": summarize(result)},
+        )
+
+    def get(self, result_id: str) -> Any:
+        """Return a summarized event's full result, or None once it has been evicted."""
+        return self._results.get(result_id)
@@ -0,0 +1,102 @@
+"""Chart sensors for the ShazamIO integration."""
+from typing import Any
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import ShazamIODataUpdateCoordinator
+
+# Tracks listed in the state attributes; the full chart is available through
+# the matching service, which is served from the same in-memory copy
+MAX_ATTRIBUTE_TRACKS = 50
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up a sensor for each warm chart."""
+    coordinator: ShazamIODataUpdateCoordinator | None = hass.data[DOMAIN][entry.entry_id].get("coordinator")
+    if coordinator is None:
+        return
+    async_add_entities(
+        ShazamIOChartSensor(coordinator, entry, key, endpoint, payload)
+        for key, (endpoint, payload) in coordinator.charts.items()
+    )
+
+
+def _chart_tracks(data: Any) -> list[dict[str, Any]]:
+    """Summarize the songs of an Apple Music chart response."""
+    items = data.get("data", []) if isinstance(data, dict) else []
+    tracks = []
+    for rank, item in enumerate(items, start=1):
+        attributes = item.get("attributes", {}) if isinstance(item, dict) else {}
+        tracks.append({
+            "rank": rank,
+            "title": attributes.get("name"),
+            "artist": attributes.get("artistName"),
+            "id": item.get("id") if isinstance(item, dict) else None,
+        })
+    return tracks
+
+
+class ShazamIOChartSensor(CoordinatorEntity[ShazamIODataUpdateCoordinator], SensorEntity):
+    """The current number one of a chart, with the chart as attributes."""
+
+    _attr_icon = "mdi:playlist-music"
+    _unrecorded_attributes = frozenset({"tracks"})
+
+    def __init__(
+        self,
+        coordinator: ShazamIODataUpdateCoordinator,
+        entry: ConfigEntry,
+        key: str,
+        endpoint: str,
+        payload: dict[str, Any],
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._key = key
+        args = [
+            payload[param]
+            for param in ("country_code", "city_name", "genre")
+            if param in payload
+        ]
+        self._attr_name = " ".join([endpoint.replace("_", " ").capitalize(), *args])
+        self._attr_unique_id = f"{entry.entry_id}_{'_'.join([endpoint, *args]).lower().replace(' ', '_')}"
+
+    @property
+    def _entry(self) -> dict[str, Any] | None:
+        return (self.coordinator.data or {}).get(self._key)
+
+    @property
+    def available(self) -> bool:
+        """Available once the chart has been fetched, even if later refreshes fail."""
+        entry = self._entry
+        return entry is not None and entry["data"] is not None
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the number one track."""
+        tracks = _chart_tracks(self._entry["data"]) if self.available else []
+        if not tracks:
+            return None
+        return f"{tracks[0]['artist']} - {tracks[0]['title']}"[:255]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the chart and its freshness."""
+        entry = self._entry
+        if entry is None:
+            return {}
+        return {
+            "tracks": _chart_tracks(entry["data"])[:MAX_ATTRIBUTE_TRACKS],
+            "fetched_at": entry["fetched_at"],
+            "stale": entry["stale"],
+            "last_error": entry["error"],
+        }
@@ -1,18 +1,26 @@
 """Service handlers for ShazamIO integration - Add-on API client."""
-import asyncio
 import logging
-from typing import Any, Dict
+import os
+from typing import Any, Dict, Optional
 import base64
+from datetime import datetime
 
 import aiohttp
+
 from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
 
-from homeassistant.helpers import template
+from homeassistant.util import dt as dt_util
 
+from .api import ShazamIOAddonClient
+from .events import ResponseEvents
+from .templates import TemplateCache
 from .const import (
     DOMAIN,
-    EVENT_SHAZAMIO_RESPONSE,
+    DATA_TEMPLATE_CACHE,
+    EVENT_MODES,
     SERVICE_RECOGNIZE,
+    SERVICE_RECOGNIZE_BATCH,
     SERVICE_ARTIST_ABOUT,
     SERVICE_TRACK_ABOUT,
     SERVICE_SEARCH_ARTIST,
@@ -27,33 +35,98 @@ from .const import (
     SERVICE_SEARCH_ALBUM,
     SERVICE_LISTENING_COUNTER,
     SERVICE_LISTENING_COUNTER_MANY,
+    SERVICE_START_LISTENING,
+    SERVICE_STOP_LISTENING,
+    SERVICE_HISTORY,
+    SERVICE_HISTORY_TOP_ARTISTS,
+    SERVICE_HISTORY_PLAY_COUNTS,
+    SERVICE_GET_RESULT,
+    MAX_LISTENING_COUNTER_IDS,
+    SHARED_PATH_ROOTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-# Add-on service URL
-ADDON_URL = "http://localhost:8099/api"
+def _get_client(hass: HomeAssistant) -> ShazamIOAddonClient:
+    """Return the pooled add-on client owned by the loaded config entry."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        client = entry_data.get("client")
+        if client is not None:
+            return client
+    raise HomeAssistantError("ShazamIO integration is not loaded")
+
+
+def _get_events(hass: HomeAssistant) -> ResponseEvents:
+    """Return the response event dispatcher owned by the loaded config entry."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        events = entry_data.get("events")
+        if events is not None:
+            return events
+    raise HomeAssistantError("ShazamIO integration is not loaded")
+
+
+def _shared_path(hass: HomeAssistant, path: str) -> Optional[str]:
+    """Return the path to send the add-on if it can read the file itself, else None."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        if entry_data.get("shared_paths"):
+            path = os.path.normpath(path)
+            return path if path.startswith(SHARED_PATH_ROOTS) else None
+    return None
+
+
+async def _upload_audio_file(hass: HomeAssistant, audio_path: str, payload: Dict[str, Any]) -> Optional[Any]:
+    """Stream a file to the add-on's recognize/stream endpoint; None if it doesn't exist."""
+    try:
+        audio_file = await hass.async_add_executor_job(open, audio_path, "rb")
+    except FileNotFoundError:
+        _LOGGER.error(f"Audio file not found: {audio_path}")
+        return None
+    try:
+        # Query parameters must be strings
+        params = {
+            key: str(value).lower() if isinstance(value, bool) else str(value)
+            for key, value in payload.items()
+        }
+        return await _get_client(hass).async_post_stream("recognize/stream", audio_file, params)
+    finally:
+        await hass.async_add_executor_job(audio_file.close)
 
 
-async def _call_addon_api(endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+def _fire_response_event(hass: HomeAssistant, call: ServiceCall, service: str, result: Any) -> None:
+    """Fire the response event in the mode the call asks for, or the configured one."""
+    mode = _render_template(hass, call.data.get("event"))
+    if mode and mode not in EVENT_MODES:
+        _LOGGER.warning("Unknown event mode %s, expected one of %s", mode, ", ".join(EVENT_MODES))
+        mode = None
+    _get_events(hass).fire(service, result, mode)
+
+
+async def _call_addon_api(hass: HomeAssistant, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """Call the ShazamIO add-on API."""
-    url = f"{ADDON_URL}/{endpoint}"
-    
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(url, json=data, timeout=aiohttp.ClientTimeout(total=60)) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientError as err:
-            _LOGGER.error(f"Error calling add-on API {endpoint}: {err}")
-            raise
-        except asyncio.TimeoutError:
-            _LOGGER.error(f"Timeout calling add-on API {endpoint}")
-            raise
+    return await _get_client(hass).async_post(endpoint, data)
+
+
+async def _call_chart_api(hass: HomeAssistant, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Serve a chart from the coordinator's warm copy, or call the add-on if it isn't kept warm.
+
+    Projected requests always go to the add-on, which trims its own cached
+    copy of the chart.
+    """
+    if "fields" in data:
+        return await _call_addon_api(hass, endpoint, data)
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        coordinator = entry_data.get("coordinator")
+        if coordinator is not None:
+            result = coordinator.get_chart(endpoint, data)
+            if result is not None:
+                return result
+    return await _call_addon_api(hass, endpoint, data)
 
 
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for ShazamIO integration."""
+    if DATA_TEMPLATE_CACHE not in hass.data:
+        hass.data[DATA_TEMPLATE_CACHE] = TemplateCache(hass)
 
     async def handle_recognize(call: ServiceCall) -> ServiceResponse:
         """Handle recognize service call."""
@@ -67,36 +140,45 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "language": language,
                 "endpoint_country": endpoint_country
             }
+            source = _render_template(hass, call.data.get("source"))
+            if source:
+                payload["source"] = source
+            for key in ("music_gate", "min_level_dbfs", "max_low_energy_ratio", "max_spectral_flatness"):
+                value = _render_template(hass, call.data.get(key))
+                if value is not None:
+                    payload[key] = value
             
             if audio_path:
-                # Read the file and send as base64 (add-on can't access HA filesystem)
-                try:
-                    def read_audio_file():
-                        with open(audio_path, "rb") as f:
-                            return f.read()
-                    
-                    audio_bytes = await hass.async_add_executor_job(read_audio_file)
-                    payload["audio_data"] = base64.b64encode(audio_bytes).decode()
-                except FileNotFoundError:
-                    _LOGGER.error(f"Audio file not found: {audio_path}")
-                    return {}
+                result = None
+                shared_path = _shared_path(hass, audio_path)
+                if shared_path:
+                    # /media and /share are mapped into the add-on: send only the path
+                    try:
+                        result = await _get_client(hass).async_post(
+                            "recognize", {**payload, "audio_path": shared_path}, expected_statuses=(404,)
+                        )
+                    except aiohttp.ClientResponseError as err:
+                        if err.status != 404:
+                            raise
+                        # Add-on runs without the folders mapped; the upload below logs if it fails too
+                        _LOGGER.debug("Add-on can't read %s, uploading it instead", shared_path)
+                if result is None:
+                    result = await _upload_audio_file(hass, audio_path, payload)
+                    if result is None:
+                        return {}
             elif audio_data:
                 # If audio_data is already base64, use it; otherwise encode it
                 if isinstance(audio_data, bytes):
                     payload["audio_data"] = base64.b64encode(audio_data).decode()
                 else:
                     payload["audio_data"] = audio_data
+                result = await _call_addon_api(hass, "recognize", payload)
             else:
                 _LOGGER.error("Either audio_data or audio_path must be provided")
                 return {}
             
-            result = await _call_addon_api("recognize", payload)
-            
             # Fire event for backwards compatibility
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_RECOGNIZE, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_RECOGNIZE, result)
             
             # Return data for response_variable
             return result
@@ -105,6 +187,35 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("Error in recognize service: %s", err)
             return {}
 
+    async def handle_recognize_batch(call: ServiceCall) -> ServiceResponse:
+        """Handle recognize_batch service call."""
+        try:
+            paths = _render_template(hass, call.data.get("paths")) or []
+            if isinstance(paths, str):
+                paths = [path.strip() for path in paths.split(",") if path.strip()]
+            
+            payload = {
+                "paths": paths,
+                "glob": _render_template(hass, call.data.get("glob")),
+                "max_parallel": int(_render_template(hass, call.data.get("max_parallel", 2))),
+                "source": _render_template(hass, call.data.get("source")),
+                "language": _render_template(hass, call.data.get("language", "en-US")),
+                "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
+            }
+            
+            # The add-on streams one result per file as it finishes; fire an
+            # event for each so automations can react before the batch ends
+            results = []
+            async for item in _get_client(hass).async_post_lines("recognize_batch", payload):
+                results.append(item)
+                _fire_response_event(hass, call, SERVICE_RECOGNIZE_BATCH, item)
+            
+            return {"results": results}
+            
+        except Exception as err:
+            _LOGGER.error("Error in recognize_batch service: %s", err)
+            return {}
+
     async def handle_artist_about(call: ServiceCall) -> ServiceResponse:
         """Handle artist_about service call."""
         try:
@@ -116,12 +227,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "extend": call.data.get("extend", [])
             }
             
-            result = await _call_addon_api("artist_about", payload)
+            result = await _call_addon_api(hass, "artist_about", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_ARTIST_ABOUT, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_ARTIST_ABOUT, result)
             
             return result
             
@@ -138,12 +246,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("track_about", payload)
+            result = await _call_addon_api(hass, "track_about", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_TRACK_ABOUT, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_TRACK_ABOUT, result)
             
             return result
             
@@ -162,12 +267,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("search_artist", payload)
+            result = await _call_addon_api(hass, "search_artist", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_SEARCH_ARTIST, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_SEARCH_ARTIST, result)
             
             return result
             
@@ -186,12 +288,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("search_track", payload)
+            result = await _call_addon_api(hass, "search_track", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_SEARCH_TRACK, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_SEARCH_TRACK, result)
             
             return result
             
@@ -210,12 +309,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("related_tracks", payload)
+            result = await _call_addon_api(hass, "related_tracks", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_RELATED_TRACKS, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_RELATED_TRACKS, result)
             
             return result
             
@@ -233,12 +329,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("top_world_tracks", payload)
+            result = await _call_chart_api(hass, "top_world_tracks", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_TOP_WORLD_TRACKS, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_TOP_WORLD_TRACKS, result)
             
             return result
             
@@ -257,12 +350,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("top_country_tracks", payload)
+            result = await _call_chart_api(hass, "top_country_tracks", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_TOP_COUNTRY_TRACKS, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_TOP_COUNTRY_TRACKS, result)
             
             return result
             
@@ -282,12 +372,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("top_city_tracks", payload)
+            result = await _call_chart_api(hass, "top_city_tracks", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_TOP_CITY_TRACKS, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_TOP_CITY_TRACKS, result)
             
             return result
             
@@ -306,12 +393,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("top_world_genre_tracks", payload)
+            result = await _call_chart_api(hass, "top_world_genre_tracks", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_TOP_WORLD_GENRE_TRACKS, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_TOP_WORLD_GENRE_TRACKS, result)
             
             return result
             
@@ -331,12 +415,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("top_country_genre_tracks", payload)
+            result = await _call_chart_api(hass, "top_country_genre_tracks", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_TOP_COUNTRY_GENRE_TRACKS, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_TOP_COUNTRY_GENRE_TRACKS, result)
             
             return result
             
@@ -355,12 +436,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("artist_albums", payload)
+            result = await _call_addon_api(hass, "artist_albums", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_ARTIST_ALBUMS, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_ARTIST_ALBUMS, result)
             
             return result
             
@@ -377,12 +455,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("search_album", payload)
+            result = await _call_addon_api(hass, "search_album", _with_fields(hass, call, payload))
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_SEARCH_ALBUM, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_SEARCH_ALBUM, result)
             
             return result
             
@@ -399,12 +474,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("listening_counter", payload)
+            result = await _call_addon_api(hass, "listening_counter", payload)
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_LISTENING_COUNTER, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_LISTENING_COUNTER, result)
             
             return result
             
@@ -415,8 +487,16 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     async def handle_listening_counter_many(call: ServiceCall) -> ServiceResponse:
         """Handle listening_counter_many service call."""
         try:
-            track_ids_str = _render_template(hass, call.data.get("track_ids"))
-            track_ids = [int(tid.strip()) for tid in track_ids_str.split(",")]
+            track_ids = _parse_track_ids(_render_template(hass, call.data.get("track_ids")))
+            if not track_ids:
+                _LOGGER.error("track_ids must contain at least one track ID")
+                return {}
+            if len(track_ids) > MAX_LISTENING_COUNTER_IDS:
+                _LOGGER.error(
+                    "track_ids has %s unique IDs, at most %s are allowed",
+                    len(track_ids), MAX_LISTENING_COUNTER_IDS
+                )
+                return {}
             
             payload = {
                 "track_ids": track_ids,
@@ -424,12 +504,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
             }
             
-            result = await _call_addon_api("listening_counter_many", payload)
+            result = await _call_addon_api(hass, "listening_counter_many", payload)
             
-            hass.bus.async_fire(
-                EVENT_SHAZAMIO_RESPONSE,
-                {"service": SERVICE_LISTENING_COUNTER_MANY, "data": result}
-            )
+            _fire_response_event(hass, call, SERVICE_LISTENING_COUNTER_MANY, result)
             
             return result
             
@@ -437,10 +514,126 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("Error in listening_counter_many service: %s", err)
             return {}
 
+    async def handle_start_listening(call: ServiceCall) -> ServiceResponse:
+        """Handle start_listening service call."""
+        try:
+            payload = {
+                "source": _render_template(hass, call.data.get("source")),
+                "listener_id": _render_template(hass, call.data.get("listener_id")),
+                "window_seconds": float(_render_template(hass, call.data.get("window_seconds", 10))),
+                "hop_seconds": float(_render_template(hass, call.data.get("hop_seconds", 5))),
+                "realtime": bool(call.data.get("realtime", False)),
+                "language": _render_template(hass, call.data.get("language", "en-US")),
+                "endpoint_country": _render_template(hass, call.data.get("endpoint_country", "GB"))
+            }
+            
+            # Track changes arrive later as ha_shazamio_response events fired
+            # by the add-on with service "listen"
+            return await _call_addon_api(hass, "listen/start", payload)
+            
+        except Exception as err:
+            _LOGGER.error("Error in start_listening service: %s", err)
+            return {}
+
+    async def handle_stop_listening(call: ServiceCall) -> ServiceResponse:
+        """Handle stop_listening service call."""
+        try:
+            payload = {
+                "listener_id": _render_template(hass, call.data.get("listener_id"))
+            }
+            
+            return await _call_addon_api(hass, "listen/stop", payload)
+            
+        except Exception as err:
+            _LOGGER.error("Error in stop_listening service: %s", err)
+            return {}
+
+    async def handle_history(call: ServiceCall) -> ServiceResponse:
+        """Handle history service call."""
+        try:
+            payload = {
+                "start": _render_datetime(hass, call.data.get("start")),
+                "end": _render_datetime(hass, call.data.get("end")),
+                "source": _render_template(hass, call.data.get("source")),
+                "artist": _render_template(hass, call.data.get("artist")),
+                "track_key": _render_template(hass, call.data.get("track_key")),
+                "limit": int(_render_template(hass, call.data.get("limit", 100))),
+                "before_id": _render_template(hass, call.data.get("before_id")),
+                "include_data": bool(call.data.get("include_data", False))
+            }
+            
+            result = await _call_addon_api(hass, "history", payload)
+            
+            _fire_response_event(hass, call, SERVICE_HISTORY, result)
+            
+            return result
+            
+        except Exception as err:
+            _LOGGER.error("Error in history service: %s", err)
+            return {}
+
+    async def handle_history_top_artists(call: ServiceCall) -> ServiceResponse:
+        """Handle history_top_artists service call."""
+        try:
+            payload = {
+                "start": _render_datetime(hass, call.data.get("start")),
+                "end": _render_datetime(hass, call.data.get("end")),
+                "source": _render_template(hass, call.data.get("source")),
+                "limit": int(_render_template(hass, call.data.get("limit", 10)))
+            }
+            
+            result = await _call_addon_api(hass, "history/top_artists", payload)
+            
+            _fire_response_event(hass, call, SERVICE_HISTORY_TOP_ARTISTS, result)
+            
+            return result
+            
+        except Exception as err:
+            _LOGGER.error("Error in history_top_artists service: %s", err)
+            return {}
+
+    async def handle_history_play_counts(call: ServiceCall) -> ServiceResponse:
+        """Handle history_play_counts service call."""
+        try:
+            track_keys = _render_template(hass, call.data.get("track_keys")) or []
+            if isinstance(track_keys, str):
+                track_keys = [key.strip() for key in track_keys.split(",") if key.strip()]
+            
+            payload = {
+                "start": _render_datetime(hass, call.data.get("start")),
+                "end": _render_datetime(hass, call.data.get("end")),
+                "source": _render_template(hass, call.data.get("source")),
+                "artist": _render_template(hass, call.data.get("artist")),
+                "track_keys": [str(key) for key in track_keys],
+                "limit": int(_render_template(hass, call.data.get("limit", 10)))
+            }
+            
+            result = await _call_addon_api(hass, "history/play_counts", payload)
+            
+            _fire_response_event(hass, call, SERVICE_HISTORY_PLAY_COUNTS, result)
+            
+            return result
+            
+        except Exception as err:
+            _LOGGER.error("Error in history_play_counts service: %s", err)
+            return {}
+
+    async def handle_get_result(call: ServiceCall) -> ServiceResponse:
+        """Handle get_result service call."""
+        result_id = _render_template(hass, call.data.get("result_id"))
+        result = _get_events(hass).get(result_id)
+        if result is None:
+            _LOGGER.error("Result %s is no longer cached", result_id)
+            return {}
+        return result
+
     # Register all services with response support
     hass.services.async_register(
         DOMAIN, SERVICE_RECOGNIZE, handle_recognize, supports_response=SupportsResponse.OPTIONAL
     )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RECOGNIZE_BATCH, handle_recognize_batch, supports_response=SupportsResponse.OPTIONAL
+    )
     hass.services.async_register(
         DOMAIN, SERVICE_ARTIST_ABOUT, handle_artist_about, supports_response=SupportsResponse.OPTIONAL
     )
@@ -483,16 +676,58 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     hass.services.async_register(
         DOMAIN, SERVICE_LISTENING_COUNTER_MANY, handle_listening_counter_many, supports_response=SupportsResponse.OPTIONAL
     )
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_LISTENING, handle_start_listening, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_LISTENING, handle_stop_listening, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_HISTORY, handle_history, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_HISTORY_TOP_ARTISTS, handle_history_top_artists, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_HISTORY_PLAY_COUNTS, handle_history_play_counts, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_GET_RESULT, handle_get_result, supports_response=SupportsResponse.ONLY
+    )
 
 
 def _render_template(hass: HomeAssistant, value: Any) -> Any:
     """Render template if value is a template string."""
+    return hass.data[DATA_TEMPLATE_CACHE].render(value)
+
+
+def _with_fields(hass: HomeAssistant, call: ServiceCall, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the response field projection to a payload if the call asks for one."""
+    fields = _render_template(hass, call.data.get("fields"))
+    if fields:
+        payload["fields"] = fields
+    return payload
+
+
+def _parse_track_ids(value: Any) -> list[int]:
+    """Parse a list or comma-separated string of track IDs, dropping duplicates."""
     if value is None:
-        return value
-    
-    if isinstance(value, str) and "{{" in value:
-        tmpl = template.Template(value, hass)
-        return tmpl.async_render(parse_result=False)
-    
-    return value
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    track_ids = [int(str(tid).strip()) for tid in value if str(tid).strip()]
+    return list(dict.fromkeys(track_ids))
+
 
+def _render_datetime(hass: HomeAssistant, value: Any) -> Any:
+    """Render a datetime parameter to ISO 8601, reading naive times as local time."""
+    value = _render_template(hass, value)
+    if value is None or value == "":
+        return None
+    parsed = value if isinstance(value, datetime) else dt_util.parse_datetime(str(value))
+    if parsed is None:
+        # Not a datetime string, e.g. a Unix timestamp; let the add-on parse it
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return parsed.isoformat()
@@ -0,0 +1,56 @@
+"""Compiled template cache for service parameters."""
+from collections import OrderedDict
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import template
+
+from .const import TEMPLATE_CACHE_SIZE
+
+
+class TemplateCache:
+    """Render service parameters, compiling each distinct template string once.
+
+    Automations call the services with the same few template strings over
+    and over, so compiled templates are kept in a bounded LRU keyed by the
+    template string. Values without a template pass straight through.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_size: int = TEMPLATE_CACHE_SIZE) -> None:
+        self._hass = hass
+        self._max_size = max_size
+        self._templates: OrderedDict[str, template.Template] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.literals = 0
+
+    def render(self, value: Any) -> Any:
+        """Render value if it is a template string, otherwise return it as-is."""
+        if not isinstance(value, str) or "{{" not in value:
+            self.literals += 1
+            return value
+
+        tmpl = self._templates.get(value)
+        if tmpl is None:
+            self.misses += 1
+            tmpl = template.Template(value, self._hass)
+            tmpl.ensure_valid()
+            self._templates[value] = tmpl
+            if len(self._templates) > self._max_size:
+                self._templates.popitem(last=False)
+        else:
+            self.hits += 1
+            self._templates.move_to_end(value)
+        return tmpl.async_render(parse_result=False)
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache size and hit counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._templates),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "literals": self.literals,
+        }
@@ -1,24 +1,185 @@
 """FastAPI application for ShazamIO Add-on."""
 import asyncio
+import glob
+import itertools
 import logging
-from typing import Optional, List, Any, Dict
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional, List, Any, AsyncIterator, Awaitable, Callable, Dict, Set, Tuple, Union
+from urllib.parse import unquote, urlsplit
 import base64
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.datastructures import UploadFile
 from shazamio import Shazam, GenreMusic
 from shazamio.schemas.artists import ArtistQuery
 from shazamio.schemas.enums import ArtistView, ArtistExtend
-from dataclass_factory import Factory
+
+from breaker import CircuitBreakers, CircuitOpenError, is_endpoint_broken
+from cache import MISSING, TTLCache
+from counters import fetch_listening_counters
+from history import HistoryStore
+from listener import STREAM_SCHEMES, ListenerManager
+import metrics
+from metrics import phase
+from options import DATA_DIR, MEDIA_ROOTS, load_options
+from pool import ShazamPool
+from preprocessing import MusicGate, NoMusicError
+from projection import Fields, project
+from ratelimit import UpstreamRateLimiter, parse_endpoint_rates, upstream_endpoint
+from scheduler import QueueFullError, RecognitionScheduler
+from serialization import JSONBytesResponse, dumps, loads, serialize_response
+from signatures import SignatureWorkers, audio_digest, signature_digest
+from singleflight import SingleFlight
+from store import MetadataStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="ShazamIO Service", version="1.0.0")
-
-# Dataclass factory for serialization
-factory = Factory()
+options = load_options()
+
+# Response cache TTLs (seconds) per endpoint. Album/track/artist metadata
+# rarely changes; charts are refreshed upstream a few times a day.
+RESPONSE_CACHE_TTLS: Dict[str, float] = {
+    "track_about": options["metadata_cache_ttl"],
+    "artist_about": options["metadata_cache_ttl"],
+    "search_album": options["metadata_cache_ttl"],
+    "artist_albums": options["metadata_cache_ttl"],
+    "related_tracks": options["metadata_cache_ttl"],
+    "top_world_tracks": options["chart_cache_ttl"],
+    "top_country_tracks": options["chart_cache_ttl"],
+    "top_city_tracks": options["chart_cache_ttl"],
+    "top_world_genre_tracks": options["chart_cache_ttl"],
+    "top_country_genre_tracks": options["chart_cache_ttl"],
+}
+
+# Endpoints persisted in the metadata store: endpoint -> (kind, ID field)
+STORED_ENDPOINTS: Dict[str, Tuple[str, str]] = {
+    "track_about": ("track", "track_id"),
+    "artist_about": ("artist", "artist_id"),
+    "artist_albums": ("artist_albums", "artist_id"),
+    "search_album": ("album", "album_id"),
+}
+METADATA_STORE_MAX_AGE = options["metadata_store_max_age_days"] * 86400
+
+# Endpoints broken upstream by Shazam API changes (issue #145), guarded by
+# circuit breakers so they fail fast instead of costing a round trip each
+BREAKER_ENDPOINTS = ("artist_about", "artist_albums", "search_album", "listening_counter")
+
+# Strong references to fire-and-forget refresh tasks
+background_tasks: Set[asyncio.Task] = set()
+
+# Upper bound on files per /api/recognize_batch call
+MAX_BATCH_ITEMS = 500
+
+# Upper bound on track IDs per /api/listening_counter_many call
+MAX_LISTENING_COUNTER_IDS = 1000
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    app.state.route_paths = {route.path for route in app.routes}
+    app.state.upstream_limiter = UpstreamRateLimiter(
+        rate=options["upstream_rate_limit"],
+        burst=options["upstream_burst"],
+        endpoint_rates=parse_endpoint_rates(options["upstream_endpoint_rate_limits"]),
+        error_threshold=options["upstream_error_threshold"],
+    )
+    app.state.shazam_pool = ShazamPool(
+        max_size=options["shazam_pool_size"],
+        connection_limit=options["upstream_connection_limit"],
+        limiter=app.state.upstream_limiter,
+        retry_attempts=options["upstream_retry_attempts"],
+        retry_base_delay=options["upstream_retry_base_delay"],
+        retry_max_delay=options["upstream_retry_max_delay"],
+    )
+    app.state.response_cache = TTLCache(max_size=options["response_cache_size"])
+    app.state.counter_cache = TTLCache(max_size=MAX_LISTENING_COUNTER_IDS * 5)
+    app.state.metadata_store = MetadataStore.open(DATA_DIR) if options["metadata_store"] else None
+    if app.state.metadata_store is not None:
+        pruned = await app.state.metadata_store.prune(METADATA_STORE_MAX_AGE)
+        logger.info(f"Metadata store ready at {app.state.metadata_store.path} (pruned {pruned} expired rows)")
+    app.state.single_flight = SingleFlight()
+    app.state.circuits = CircuitBreakers(
+        BREAKER_ENDPOINTS,
+        failure_threshold=options["circuit_failure_threshold"],
+        cooldown=options["circuit_cooldown"],
+    )
+    app.state.recognition_scheduler = RecognitionScheduler(
+        max_concurrency=options["recognition_concurrency"],
+        max_queue=options["recognition_queue_size"],
+    )
+    app.state.signature_workers = SignatureWorkers(
+        workers=options["signature_workers"],
+        preprocess={
+            "window_seconds": options["preprocess_window_seconds"],
+            "selection": options["preprocess_window_selection"],
+        } if options["preprocess_audio"] else None,
+    )
+    app.state.recognition_cache = TTLCache(max_size=options["recognition_cache_size"])
+    app.state.history = (
+        HistoryStore.open(DATA_DIR, store_payload=options["history_store_payload"])
+        if options["recognition_history"] else None
+    )
+    if app.state.history is not None and options["history_retention_days"]:
+        pruned = await app.state.history.prune(options["history_retention_days"] * 86400)
+        logger.info(f"Recognition history pruned {pruned} rows")
+    app.state.listeners = ListenerManager(
+        recognize_window,
+        max_listeners=options["max_listeners"],
+        on_change=record_history,
+    )
+    logger.info(f"Shazam client pool ready (max_size={app.state.shazam_pool.max_size})")
+    try:
+        yield
+    finally:
+        logger.info(f"Shutting down Shazam client pool: {app.state.shazam_pool.stats()}")
+        await app.state.listeners.close()
+        await app.state.shazam_pool.close()
+        for task in list(background_tasks):
+            task.cancel()
+        if app.state.metadata_store is not None:
+            app.state.metadata_store.close()
+        if app.state.history is not None:
+            app.state.history.close()
+        app.state.signature_workers.shutdown()
+
+
+app = FastAPI(
+    title="ShazamIO Service",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=JSONBytesResponse,
+)
+
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """Tag the request's endpoint for the upstream rate limiter and record request metrics.
+
+    Unknown paths are all labelled "other" so scans can't blow up the
+    number of metric series.
+    """
+    path = request.url.path
+    endpoint = path.removeprefix("/api/") if path in app.state.route_paths else "other"
+    upstream_endpoint.set(endpoint)
+    metrics.requests_in_flight.inc(endpoint)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.requests_in_flight.dec(endpoint)
+        metrics.request_seconds.observe(time.perf_counter() - start, endpoint)
+        metrics.requests_total.inc(endpoint, str(status))
 
 # Apply workaround for ShazamIO issue #145
 # Fix broken search endpoints by patching the URL
@@ -46,42 +207,293 @@ except Exception as e:
     logger.warning(f"Could not apply ShazamIO workarounds: {e}", exc_info=True)
 
 
-def serialize_response(obj: Any) -> Dict[str, Any]:
-    """Convert ShazamIO response objects to dictionaries."""
-    try:
-        if hasattr(obj, '__dict__'):
-            # It's a dataclass or similar object
-            return factory.dump(obj, Dict[str, Any])
-        elif isinstance(obj, dict):
-            return obj
+def get_shazam(language: str, endpoint_country: str) -> Shazam:
+    """Return a pooled Shazam instance for the given locale."""
+    return app.state.shazam_pool.get(language, endpoint_country)
+
+
+def music_gate(
+    enabled: Optional[bool] = None,
+    min_level_dbfs: Optional[float] = None,
+    max_low_energy_ratio: Optional[float] = None,
+    max_spectral_flatness: Optional[float] = None,
+) -> Optional[MusicGate]:
+    """Music gate for a recognition: per-request thresholds over the add-on options, or None when off."""
+    if not (options["music_gate"] if enabled is None else enabled):
+        return None
+    return MusicGate(
+        min_level_dbfs=options["music_gate_min_level_dbfs"] if min_level_dbfs is None else min_level_dbfs,
+        max_low_energy_ratio=options["music_gate_max_low_energy_ratio"] if max_low_energy_ratio is None else max_low_energy_ratio,
+        max_spectral_flatness=options["music_gate_max_spectral_flatness"] if max_spectral_flatness is None else max_spectral_flatness,
+    )
+
+
+def no_music_result(e: NoMusicError, started: float) -> Dict[str, Any]:
+    """Result for audio the music gate skipped, with its measurements and timings."""
+    metrics.recognitions_skipped_total.inc(upstream_endpoint.get(), e.reason)
+    logger.info(f"Skipped recognition: {e} {e.levels}")
+    return {
+        "matches": [],
+        "no_music": True,
+        "reason": e.reason,
+        "gate": {**e.levels, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)},
+    }
+
+
+async def recognize_audio(
+    language: str,
+    endpoint_country: str,
+    data: Union[str, bytes, bytearray],
+    response: Optional[Response] = None,
+    gate: Optional[MusicGate] = None,
+    wait: bool = False,
+) -> Dict[str, Any]:
+    """Recognize audio once a recognition slot is free.
+
+    Results are cached by a hash of the audio bytes (checked before queuing)
+    and by the computed signature (checked before going upstream). The
+    signature is computed by the worker pool; only the signature is sent
+    upstream. Audio the music gate rejects gets a no_music result, which is
+    not cached since other thresholds may accept it. Raises a 429 with
+    Retry-After when the recognition queue is full, unless wait is set.
+    """
+    cache: TTLCache = app.state.recognition_cache
+    ttl = options["recognition_cache_ttl"]
+    started = time.perf_counter()
+
+    audio_key = ("audio", language, endpoint_country, await asyncio.to_thread(audio_digest, data))
+    value = cache.get(audio_key)
+    cache_status = "HIT"
+    if value is MISSING:
+        try:
+            async with app.state.recognition_scheduler.slot(wait=wait):
+                with phase("signature"):
+                    signature = await app.state.signature_workers.compute(data, gate)
+                signature_key = ("signature", language, endpoint_country, signature_digest(signature))
+                value = cache.get(signature_key)
+                if value is MISSING:
+                    shazam = get_shazam(language, endpoint_country)
+                    result = await shazam.send_recognize_request_v2(sig=signature)
+                    with phase("serialize"):
+                        value = serialize_response(result)
+                    cache.set(signature_key, value, ttl)
+                    cache_status = "MISS"
+        except QueueFullError as e:
+            raise HTTPException(
+                status_code=429,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except NoMusicError as e:
+            value = no_music_result(e, started)
+            cache_status = "MISS"
         else:
-            # Try to convert to dict
-            return dict(obj)
+            cache.set(audio_key, value, ttl)
+
+    if response is not None:
+        response.headers["X-Cache"] = cache_status
+    return value
+
+
+async def recognize_window(language: str, endpoint_country: str, audio: bytes) -> Dict[str, Any]:
+    """Recognize one window of a live stream.
+
+    Bypasses the recognition cache (stream windows never repeat) and lets
+    QueueFullError through so the listener can skip the window. Windows the
+    music gate rejects are never sent upstream.
+    """
+    upstream_endpoint.set("listen")
+    started = time.perf_counter()
+    async with app.state.recognition_scheduler.slot():
+        try:
+            with phase("signature"):
+                signature = await app.state.signature_workers.compute(audio, music_gate())
+        except NoMusicError as e:
+            return no_music_result(e, started)
+        shazam = get_shazam(language, endpoint_country)
+        result = await shazam.send_recognize_request_v2(sig=signature)
+        with phase("serialize"):
+            return serialize_response(result)
+
+
+async def record_history(source: Optional[str], result: Dict[str, Any]) -> None:
+    """Append a recognition result to the history; failures are logged, not raised."""
+    if app.state.history is None:
+        return
+    try:
+        await app.state.history.record(result, source)
     except Exception as e:
-        logger.warning(f"Could not serialize response: {e}, returning as-is")
-        return {"raw_response": str(obj)}
+        logger.warning(f"Could not record recognition history: {e}")
+
+
+def circuit_open_error(e: CircuitOpenError) -> HTTPException:
+    """503 for an endpoint whose circuit breaker is open."""
+    return HTTPException(
+        status_code=503,
+        detail=f"{e.endpoint} is currently unavailable due to Shazam API changes and is not being retried for {e.retry_after}s. See https://github.com/shazamio/ShazamIO/issues/145",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def refresh_in_background(key: Any, fetch: Callable[[], Awaitable[Any]]) -> None:
+    """Refresh a stale entry without making the caller wait for it."""
+
+    async def refresh() -> None:
+        try:
+            await app.state.single_flight.do(key, fetch)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key[0]} failed: {e}")
+
+    task = asyncio.create_task(refresh())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+async def cached_call(
+    endpoint: str,
+    request: BaseModel,
+    fetch: Callable[[], Awaitable[Any]],
+) -> JSONBytesResponse:
+    """Serve an endpoint from the response cache, calling upstream on a miss.
+
+    The cache key is the endpoint plus the validated request model, so
+    requests that differ only in omitted defaults share an entry. Identical
+    misses that arrive while a call is in flight wait for that call instead
+    of going upstream themselves.
+
+    Metadata endpoints also fall back to the persistent store: rows younger
+    than the cache TTL are served as-is, older rows (up to the store's max
+    age) are served immediately while a refresh runs in the background.
+
+    Responses are cached and stored as encoded JSON bodies, so hits are sent
+    without any serialization work. A field projection is left out of the
+    key and applied to the full body on the way out, so slim and full
+    requests share one upstream call and one cache entry.
+    """
+    cache: TTLCache = app.state.response_cache
+    key = (endpoint, request.model_dump_json(exclude={"fields"}))
+    ttl = RESPONSE_CACHE_TTLS[endpoint]
+    fields = getattr(request, "fields", None)
+
+    def respond(body: bytes, cache_status: str) -> JSONBytesResponse:
+        if fields:
+            with phase("serialize"):
+                body = dumps(project(loads(body), fields))
+        return JSONBytesResponse(body, headers={"X-Cache": cache_status})
+
+    body = cache.get(key)
+    if body is not MISSING:
+        return respond(body, "HIT")
+
+    store: Optional[MetadataStore] = app.state.metadata_store
+    stored = STORED_ENDPOINTS.get(endpoint) if store is not None else None
+
+    async def fetch_and_store() -> bytes:
+        result = await app.state.circuits.call(endpoint, fetch)
+        with phase("serialize"):
+            result = dumps(serialize_response(result))
+        cache.set(key, result, ttl)
+        if stored is not None:
+            kind, id_field = stored
+            await store.put(kind, getattr(request, id_field), key[1], result)
+        return result
+
+    if stored is not None:
+        kind, id_field = stored
+        row = await store.get(kind, getattr(request, id_field), key[1])
+        if row is not None:
+            body, age = row
+            if age < ttl:
+                cache.set(key, body, ttl - age)
+                return respond(body, "STORE")
+            if age < METADATA_STORE_MAX_AGE:
+                refresh_in_background(key, fetch_and_store)
+                return respond(body, "STALE")
+
+    body, shared = await app.state.single_flight.do(key, fetch_and_store)
+    return respond(body, "COALESCED" if shared else "MISS")
 
 
 # Request models
 class RecognizeRequest(BaseModel):
     audio_data: Optional[str] = None  # Base64 encoded
     audio_path: Optional[str] = None
+    source: Optional[str] = None  # Device or entity recorded in the history
+    language: str = "en-US"
+    endpoint_country: str = "GB"
+    # Music gate overrides; None uses the add-on options
+    music_gate: Optional[bool] = None
+    min_level_dbfs: Optional[float] = Field(default=None, ge=-120, le=0)
+    max_low_energy_ratio: Optional[float] = Field(default=None, ge=0, le=1)
+    max_spectral_flatness: Optional[float] = Field(default=None, ge=0, le=1)
+
+
+class RecognizeBatchRequest(BaseModel):
+    paths: List[str] = []
+    glob: Optional[str] = None  # e.g. "/media/recordings/**/*.wav"
+    max_parallel: int = Field(default=2, ge=1, le=16)
+    source: Optional[str] = None
     language: str = "en-US"
     endpoint_country: str = "GB"
 
 
+class ListenRequest(BaseModel):
+    source: str  # http(s)/rtsp URL, or a file or named pipe under the media folders
+    listener_id: Optional[str] = None
+    window_seconds: float = Field(default=10, ge=3, le=30)
+    hop_seconds: float = Field(default=5, ge=1, le=60)
+    realtime: bool = False  # Read at native rate, for files standing in for live sources
+    pcm_sample_rate: Optional[int] = None  # Set for headerless s16le PCM input
+    pcm_channels: int = 1
+    language: str = "en-US"
+    endpoint_country: str = "GB"
+
+
+class ListenStopRequest(BaseModel):
+    listener_id: str
+
+
+class HistoryRequest(BaseModel):
+    start: Optional[datetime] = None  # ISO 8601 or Unix timestamp
+    end: Optional[datetime] = None
+    source: Optional[str] = None
+    artist: Optional[str] = None
+    track_key: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=1000)
+    before_id: Optional[int] = None  # Continue after the last row of a previous page
+    include_data: bool = False
+
+
+class HistoryTopArtistsRequest(BaseModel):
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    source: Optional[str] = None
+    limit: int = Field(default=10, ge=1, le=1000)
+
+
+class HistoryPlayCountsRequest(BaseModel):
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    source: Optional[str] = None
+    artist: Optional[str] = None
+    track_keys: List[str] = Field(default=[], max_length=1000)
+    limit: int = Field(default=10, ge=1, le=1000)
+
+
 class ArtistAboutRequest(BaseModel):
     artist_id: int
     views: Optional[List[str]] = None
     extend: Optional[List[str]] = None
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class TrackAboutRequest(BaseModel):
     track_id: int
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class SearchRequest(BaseModel):
@@ -90,6 +502,7 @@ class SearchRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class TracksRequest(BaseModel):
@@ -97,6 +510,7 @@ class TracksRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class CountryTracksRequest(BaseModel):
@@ -105,6 +519,7 @@ class CountryTracksRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class CityTracksRequest(BaseModel):
@@ -114,6 +529,7 @@ class CityTracksRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class GenreTracksRequest(BaseModel):
@@ -122,6 +538,7 @@ class GenreTracksRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class CountryGenreTracksRequest(BaseModel):
@@ -131,6 +548,7 @@ class CountryGenreTracksRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class AlbumsRequest(BaseModel):
@@ -139,12 +557,14 @@ class AlbumsRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class AlbumRequest(BaseModel):
     album_id: int
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 class ListeningCounterRequest(BaseModel):
@@ -154,7 +574,7 @@ class ListeningCounterRequest(BaseModel):
 
 
 class ListeningCounterManyRequest(BaseModel):
-    track_ids: List[int]
+    track_ids: List[int] = Field(min_length=1, max_length=MAX_LISTENING_COUNTER_IDS)
     language: str = "en-US"
     endpoint_country: str = "GB"
 
@@ -165,6 +585,7 @@ class RelatedTracksRequest(BaseModel):
     offset: int = 0
     language: str = "en-US"
     endpoint_country: str = "GB"
+    fields: Fields = None  # Dotted paths or "slim" to trim the response
 
 
 @app.get("/")
@@ -173,32 +594,331 @@ async def root():
     return {"status": "ok", "service": "ShazamIO"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics() -> Response:
+    """Request, phase and upstream metrics in the Prometheus text format."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/api/status")
+async def status() -> Dict[str, Any]:
+    """Report internal pool statistics."""
+    return {
+        "shazam_pool": app.state.shazam_pool.stats(),
+        "upstream": app.state.upstream_limiter.stats(),
+        "response_cache": app.state.response_cache.stats(),
+        "counter_cache": app.state.counter_cache.stats(),
+        "metadata_store": app.state.metadata_store.stats() if app.state.metadata_store else None,
+        "single_flight": app.state.single_flight.stats(),
+        "circuits": app.state.circuits.stats(),
+        "recognition": app.state.recognition_scheduler.stats(),
+        "signature_workers": app.state.signature_workers.stats(),
+        "recognition_cache": app.state.recognition_cache.stats(),
+        "history": app.state.history.stats() if app.state.history else None,
+    }
+
+
 @app.post("/api/recognize")
-async def recognize(request: RecognizeRequest) -> Dict[str, Any]:
+async def recognize(request: RecognizeRequest, response: Response) -> Dict[str, Any]:
     """Recognize a track from audio data or file path."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        
+        gate = music_gate(
+            request.music_gate,
+            request.min_level_dbfs,
+            request.max_low_energy_ratio,
+            request.max_spectral_flatness,
+        )
         if request.audio_path:
-            result = await shazam.recognize(request.audio_path)
+            # Read from the mapped /media and /share folders; the audio never
+            # crosses the API. 404 lets callers fall back to uploading it.
+            if not await asyncio.to_thread(os.path.isfile, request.audio_path):
+                raise HTTPException(status_code=404, detail=f"Audio file not found: {request.audio_path}")
+            result = await recognize_audio(request.language, request.endpoint_country, request.audio_path, response, gate)
         elif request.audio_data:
             # Decode base64 audio data
-            audio_bytes = base64.b64decode(request.audio_data)
-            result = await shazam.recognize(audio_bytes)
+            with phase("decode"):
+                audio_bytes = base64.b64decode(request.audio_data)
+            result = await recognize_audio(request.language, request.endpoint_country, audio_bytes, response, gate)
         else:
             raise HTTPException(status_code=400, detail="Either audio_data or audio_path must be provided")
-        
-        return serialize_response(result)
+        await record_history(request.source, result)
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in recognize: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def read_audio_upload(http_request: Request) -> Union[bytes, bytearray]:
+    """Read a raw or multipart audio upload without base64 or JSON decoding.
+
+    Raw bodies are rejected up front when Content-Length exceeds the upload
+    limit, then copied chunk by chunk into a single buffer preallocated from
+    it (chunked bodies grow the buffer instead); multipart uploads are spooled
+    by Starlette and read from the first file part.
+    """
+    max_bytes = options["max_audio_upload_mb"] * 1024 * 1024
+    content_type = http_request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await http_request.form()
+        upload = next((v for v in form.values() if isinstance(v, UploadFile)), None)
+        if upload is None:
+            raise HTTPException(status_code=400, detail="Multipart body must contain an audio file part")
+        if upload.size is not None and upload.size > max_bytes:
+            raise HTTPException(status_code=413, detail="Audio upload too large")
+        return await upload.read()
+
+    content_length = http_request.headers.get("content-length", "")
+    if not content_length.isdigit():
+        # Chunked body: grow the buffer as it arrives
+        audio = bytearray()
+        async for chunk in http_request.stream():
+            audio.extend(chunk)
+            if len(audio) > max_bytes:
+                raise HTTPException(status_code=413, detail="Audio upload too large")
+        return audio
+
+    expected = int(content_length)
+    if expected > max_bytes:
+        raise HTTPException(status_code=413, detail="Audio upload too large")
+    audio = bytearray(expected)
+    received = 0
+    with memoryview(audio) as view:
+        async for chunk in http_request.stream():
+            end = received + len(chunk)
+            if end > expected:
+                raise HTTPException(status_code=400, detail="Audio upload longer than its Content-Length")
+            view[received:end] = chunk
+            received = end
+    del audio[received:]
+    return audio
+
+
+@app.post("/api/recognize/stream")
+async def recognize_stream(
+    http_request: Request,
+    response: Response,
+    language: str = "en-US",
+    endpoint_country: str = "GB",
+    source: Optional[str] = None,
+    music_gate_enabled: Optional[bool] = Query(default=None, alias="music_gate"),
+    min_level_dbfs: Optional[float] = Query(default=None, ge=-120, le=0),
+    max_low_energy_ratio: Optional[float] = Query(default=None, ge=0, le=1),
+    max_spectral_flatness: Optional[float] = Query(default=None, ge=0, le=1),
+) -> Dict[str, Any]:
+    """Recognize a track from a raw (application/octet-stream) or multipart audio upload."""
+    try:
+        with phase("decode"):
+            audio = await read_audio_upload(http_request)
+        if not audio:
+            raise HTTPException(status_code=400, detail="Request body must contain audio data")
+
+        gate = music_gate(music_gate_enabled, min_level_dbfs, max_low_energy_ratio, max_spectral_flatness)
+        result = await recognize_audio(language, endpoint_country, audio, response, gate)
+        await record_history(source, result)
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in recognize_stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def is_media_path(path: str) -> bool:
+    """Whether path is inside one of the mapped media folders, after resolving .. and symlinks."""
+    resolved = os.path.realpath(path)
+    return any(resolved.startswith(os.path.join(os.path.realpath(root), "")) for root in MEDIA_ROOTS)
+
+
+def media_path_error(path: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"{path} is not under {' or '.join(MEDIA_ROOTS)}")
+
+
+def resolve_batch_paths(request: RecognizeBatchRequest) -> List[str]:
+    """Expand the batch glob and merge it with explicit paths, keeping order.
+
+    Every path and the glob must be under the mapped media folders. Stops
+    reading the glob once the batch is over MAX_BATCH_ITEMS.
+    """
+    for path in request.paths:
+        if not is_media_path(path):
+            raise media_path_error(path)
+    paths = list(request.paths)
+    if request.glob:
+        if not is_media_path(request.glob):
+            raise media_path_error(request.glob)
+        # Matches are checked too: a symlink under /media may point elsewhere
+        matches = (p for p in glob.iglob(request.glob, recursive=True) if os.path.isfile(p) and is_media_path(p))
+        paths += sorted(itertools.islice(matches, MAX_BATCH_ITEMS + 1))
+    return list(dict.fromkeys(paths))
+
+
+@app.post("/api/recognize_batch")
+async def recognize_batch(request: RecognizeBatchRequest) -> StreamingResponse:
+    """Recognize many files, streaming one NDJSON line per file as it finishes.
+
+    Files wait for a recognition slot rather than failing when the queue is
+    full; at most recognition_concurrency + recognition_queue_size of them
+    are in flight.
+    """
+    if len(request.paths) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {MAX_BATCH_ITEMS} files, got {len(request.paths)}")
+    paths = await asyncio.to_thread(resolve_batch_paths, request)
+    if not paths:
+        raise HTTPException(status_code=400, detail="No audio files matched paths or glob")
+    if len(paths) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {MAX_BATCH_ITEMS} files")
+
+    max_parallel = min(request.max_parallel, options["recognition_concurrency"] + options["recognition_queue_size"])
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async def recognize_one(path: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await recognize_audio(request.language, request.endpoint_country, path, gate=music_gate(), wait=True)
+                await record_history(request.source, result)
+                return {"path": path, "result": result}
+            except HTTPException as e:
+                return {"path": path, "error": e.detail, "status": e.status_code}
+            except Exception as e:
+                logger.error(f"Error in recognize_batch ({path}): {e}")
+                return {"path": path, "error": str(e), "status": 500}
+
+    async def results() -> AsyncIterator[bytes]:
+        tasks = [asyncio.create_task(recognize_one(path)) for path in paths]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield dumps(await next_done) + b"\n"
+        finally:
+            # Client went away: stop work that nobody will read
+            for task in tasks:
+                task.cancel()
+
+    logger.info(f"recognize_batch: {len(paths)} files, max_parallel={max_parallel}")
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+def listen_source(source: str) -> str:
+    """The ffmpeg input for a listener source; 400 for anything but a stream URL or a media file.
+
+    Files are passed as file:<resolved path> so ffmpeg can't read the name as
+    another protocol (concat:, subfile:, ...).
+    """
+    parts = urlsplit(source)
+    if parts.scheme in STREAM_SCHEMES and parts.netloc:
+        return source
+    if parts.scheme in ("", "file"):
+        path = unquote(parts.path) if parts.scheme else source
+        if not path or not is_media_path(path):
+            raise media_path_error(source)
+        return f"file:{os.path.realpath(path)}"
+    raise HTTPException(
+        status_code=400,
+        detail=f"Unsupported listener source {source}: use an {'/'.join(STREAM_SCHEMES)} URL or a file under {' or '.join(MEDIA_ROOTS)}",
+    )
+
+
+@app.post("/api/listen/start")
+async def listen_start(request: ListenRequest) -> Dict[str, Any]:
+    """Start continuously recognizing an audio stream."""
+    source = await asyncio.to_thread(listen_source, request.source)
+    try:
+        listener = app.state.listeners.start(
+            listener_id=request.listener_id,
+            source=source,
+            language=request.language,
+            endpoint_country=request.endpoint_country,
+            window_seconds=request.window_seconds,
+            hop_seconds=request.hop_seconds,
+            realtime=request.realtime,
+            pcm_sample_rate=request.pcm_sample_rate,
+            pcm_channels=request.pcm_channels,
+        )
+        return listener.status()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.post("/api/listen/stop")
+async def listen_stop(request: ListenStopRequest) -> Dict[str, Any]:
+    """Stop a stream listener."""
+    listener = await app.state.listeners.stop(request.listener_id)
+    if listener is None:
+        raise HTTPException(status_code=404, detail=f"Unknown listener {request.listener_id}")
+    return listener.status()
+
+
+@app.get("/api/listen")
+async def listen_list() -> List[Dict[str, Any]]:
+    """List stream listeners."""
+    return app.state.listeners.list()
+
+
+def to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Convert an optional request datetime to a Unix timestamp (naive means UTC)."""
+    if value is None:
+        return None
+    return value.timestamp() if value.tzinfo else value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def get_history() -> HistoryStore:
+    if app.state.history is None:
+        raise HTTPException(status_code=503, detail="Recognition history is disabled")
+    return app.state.history
+
+
+@app.post("/api/history")
+async def history(request: HistoryRequest) -> JSONBytesResponse:
+    """List recognitions in a time range, newest first."""
+    items = await get_history().recognitions(
+        start=to_timestamp(request.start),
+        end=to_timestamp(request.end),
+        source=request.source,
+        artist=request.artist,
+        track_key=request.track_key,
+        limit=request.limit,
+        before_id=request.before_id,
+        include_payload=request.include_data,
+    )
+    return JSONBytesResponse({
+        "recognitions": items,
+        "next_before_id": items[-1]["id"] if len(items) == request.limit else None,
+    })
+
+
+@app.post("/api/history/top_artists")
+async def history_top_artists(request: HistoryTopArtistsRequest) -> JSONBytesResponse:
+    """Most recognized artists in a time range."""
+    artists = await get_history().top_artists(
+        start=to_timestamp(request.start),
+        end=to_timestamp(request.end),
+        source=request.source,
+        limit=request.limit,
+    )
+    return JSONBytesResponse({"artists": artists})
+
+
+@app.post("/api/history/play_counts")
+async def history_play_counts(request: HistoryPlayCountsRequest) -> JSONBytesResponse:
+    """Play counts per track in a time range, most played first."""
+    tracks = await get_history().play_counts(
+        start=to_timestamp(request.start),
+        end=to_timestamp(request.end),
+        source=request.source,
+        artist=request.artist,
+        track_keys=request.track_keys,
+        limit=request.limit,
+    )
+    return JSONBytesResponse({"tracks": tracks})
+
+
 @app.post("/api/artist_about")
-async def artist_about(request: ArtistAboutRequest) -> Dict[str, Any]:
+async def artist_about(request: ArtistAboutRequest) -> JSONBytesResponse:
     """Get information about an artist."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
+        shazam = get_shazam(request.language, request.endpoint_country)
         
         query = None
         if request.views or request.extend:
@@ -206,11 +926,14 @@ async def artist_about(request: ArtistAboutRequest) -> Dict[str, Any]:
             extend = [ArtistExtend(e) for e in request.extend] if request.extend else []
             query = ArtistQuery(views=views, extend=extend)
         
-        result = await shazam.artist_about(request.artist_id, query=query)
-        return serialize_response(result)
+        return await cached_call(
+            "artist_about", request,
+            lambda: shazam.artist_about(request.artist_id, query=query),
+        )
+    except CircuitOpenError as e:
+        raise circuit_open_error(e)
     except Exception as e:
-        error_msg = str(e)
-        if "405" in error_msg or "Failed to decode json" in error_msg:
+        if is_endpoint_broken(e):
             logger.error(f"artist_about endpoint is broken due to Shazam API changes (issue #145). artist_id={request.artist_id}")
             raise HTTPException(status_code=503, detail="This endpoint is currently unavailable due to Shazam API changes. See https://github.com/shazamio/ShazamIO/issues/145")
         logger.error(f"Error in artist_about (artist_id={request.artist_id}): {e}", exc_info=True)
@@ -218,159 +941,176 @@ async def artist_about(request: ArtistAboutRequest) -> Dict[str, Any]:
 
 
 @app.post("/api/track_about")
-async def track_about(request: TrackAboutRequest) -> Dict[str, Any]:
+async def track_about(request: TrackAboutRequest) -> JSONBytesResponse:
     """Get information about a track."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.track_about(track_id=request.track_id)
-        return serialize_response(result)
+        shazam = get_shazam(request.language, request.endpoint_country)
+        return await cached_call(
+            "track_about", request,
+            lambda: shazam.track_about(track_id=request.track_id),
+        )
     except Exception as e:
         logger.error(f"Error in track_about: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/search_artist")
-async def search_artist(request: SearchRequest) -> Dict[str, Any]:
+async def search_artist(request: SearchRequest) -> JSONBytesResponse:
     """Search for artists."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
+        shazam = get_shazam(request.language, request.endpoint_country)
         result = await shazam.search_artist(
             query=request.query,
             limit=request.limit,
             offset=request.offset
         )
-        return serialize_response(result)
+        return JSONBytesResponse(project(serialize_response(result), request.fields))
     except Exception as e:
         logger.error(f"Error in search_artist: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/search_track")
-async def search_track(request: SearchRequest) -> Dict[str, Any]:
+async def search_track(request: SearchRequest) -> JSONBytesResponse:
     """Search for tracks."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
+        shazam = get_shazam(request.language, request.endpoint_country)
         result = await shazam.search_track(
             query=request.query,
             limit=request.limit,
             offset=request.offset
         )
-        return serialize_response(result)
+        return JSONBytesResponse(project(serialize_response(result), request.fields))
     except Exception as e:
         logger.error(f"Error in search_track: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/related_tracks")
-async def related_tracks(request: RelatedTracksRequest) -> Dict[str, Any]:
+async def related_tracks(request: RelatedTracksRequest) -> JSONBytesResponse:
     """Get related tracks."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.related_tracks(
-            track_id=request.track_id,
-            limit=request.limit,
-            offset=request.offset
+        shazam = get_shazam(request.language, request.endpoint_country)
+        return await cached_call(
+            "related_tracks", request,
+            lambda: shazam.related_tracks(
+                track_id=request.track_id,
+                limit=request.limit,
+                offset=request.offset
+            ),
         )
-        return serialize_response(result)
     except Exception as e:
         logger.error(f"Error in related_tracks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/top_world_tracks")
-async def top_world_tracks(request: TracksRequest) -> Dict[str, Any]:
+async def top_world_tracks(request: TracksRequest) -> JSONBytesResponse:
     """Get top world tracks."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.top_world_tracks(limit=request.limit, offset=request.offset)
-        return serialize_response(result)
+        shazam = get_shazam(request.language, request.endpoint_country)
+        return await cached_call(
+            "top_world_tracks", request,
+            lambda: shazam.top_world_tracks(limit=request.limit, offset=request.offset),
+        )
     except Exception as e:
         logger.error(f"Error in top_world_tracks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/top_country_tracks")
-async def top_country_tracks(request: CountryTracksRequest) -> Dict[str, Any]:
+async def top_country_tracks(request: CountryTracksRequest) -> JSONBytesResponse:
     """Get top country tracks."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.top_country_tracks(
-            country_code=request.country_code,
-            limit=request.limit,
-            offset=request.offset
+        shazam = get_shazam(request.language, request.endpoint_country)
+        return await cached_call(
+            "top_country_tracks", request,
+            lambda: shazam.top_country_tracks(
+                country_code=request.country_code,
+                limit=request.limit,
+                offset=request.offset
+            ),
         )
-        return serialize_response(result)
     except Exception as e:
         logger.error(f"Error in top_country_tracks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/top_city_tracks")
-async def top_city_tracks(request: CityTracksRequest) -> Dict[str, Any]:
+async def top_city_tracks(request: CityTracksRequest) -> JSONBytesResponse:
     """Get top city tracks."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.top_city_tracks(
-            country_code=request.country_code,
-            city_name=request.city_name,
-            limit=request.limit,
-            offset=request.offset
+        shazam = get_shazam(request.language, request.endpoint_country)
+        return await cached_call(
+            "top_city_tracks", request,
+            lambda: shazam.top_city_tracks(
+                country_code=request.country_code,
+                city_name=request.city_name,
+                limit=request.limit,
+                offset=request.offset
+            ),
         )
-        return serialize_response(result)
     except Exception as e:
         logger.error(f"Error in top_city_tracks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/top_world_genre_tracks")
-async def top_world_genre_tracks(request: GenreTracksRequest) -> Dict[str, Any]:
+async def top_world_genre_tracks(request: GenreTracksRequest) -> JSONBytesResponse:
     """Get top world genre tracks."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
+        shazam = get_shazam(request.language, request.endpoint_country)
         genre_enum = GenreMusic(request.genre)
-        result = await shazam.top_world_genre_tracks(
-            genre=genre_enum,
-            limit=request.limit,
-            offset=request.offset
+        return await cached_call(
+            "top_world_genre_tracks", request,
+            lambda: shazam.top_world_genre_tracks(
+                genre=genre_enum,
+                limit=request.limit,
+                offset=request.offset
+            ),
         )
-        return serialize_response(result)
     except Exception as e:
         logger.error(f"Error in top_world_genre_tracks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/top_country_genre_tracks")
-async def top_country_genre_tracks(request: CountryGenreTracksRequest) -> Dict[str, Any]:
+async def top_country_genre_tracks(request: CountryGenreTracksRequest) -> JSONBytesResponse:
     """Get top country genre tracks."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
+        shazam = get_shazam(request.language, request.endpoint_country)
         genre_enum = GenreMusic(request.genre)
-        result = await shazam.top_country_genre_tracks(
-            country_code=request.country_code,
-            genre=genre_enum,
-            limit=request.limit,
-            offset=request.offset
+        return await cached_call(
+            "top_country_genre_tracks", request,
+            lambda: shazam.top_country_genre_tracks(
+                country_code=request.country_code,
+                genre=genre_enum,
+                limit=request.limit,
+                offset=request.offset
+            ),
         )
-        return serialize_response(result)
     except Exception as e:
         logger.error(f"Error in top_country_genre_tracks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/artist_albums")
-async def artist_albums(request: AlbumsRequest) -> Dict[str, Any]:
+async def artist_albums(request: AlbumsRequest) -> JSONBytesResponse:
     """Get artist albums."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.artist_albums(
-            artist_id=request.artist_id,
-            limit=request.limit,
-            offset=request.offset
+        shazam = get_shazam(request.language, request.endpoint_country)
+        return await cached_call(
+            "artist_albums", request,
+            lambda: shazam.artist_albums(
+                artist_id=request.artist_id,
+                limit=request.limit,
+                offset=request.offset
+            ),
         )
-        return serialize_response(result)
+    except CircuitOpenError as e:
+        raise circuit_open_error(e)
     except Exception as e:
-        error_msg = str(e)
-        if "405" in error_msg or "Failed to decode json" in error_msg:
+        if is_endpoint_broken(e):
             logger.error(f"artist_albums endpoint is broken due to Shazam API changes (issue #145). artist_id={request.artist_id}")
             raise HTTPException(status_code=503, detail="This endpoint is currently unavailable due to Shazam API changes. See https://github.com/shazamio/ShazamIO/issues/145")
         logger.error(f"Error in artist_albums (artist_id={request.artist_id}): {e}", exc_info=True)
@@ -378,17 +1118,19 @@ async def artist_albums(request: AlbumsRequest) -> Dict[str, Any]:
 
 
 @app.post("/api/search_album")
-async def search_album(request: AlbumRequest) -> Dict[str, Any]:
+async def search_album(request: AlbumRequest) -> JSONBytesResponse:
     """Get album information."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
+        shazam = get_shazam(request.language, request.endpoint_country)
         logger.info(f"Calling search_album with album_id={request.album_id}, endpoint_country={request.endpoint_country}")
-        result = await shazam.search_album(album_id=request.album_id)
-        logger.info(f"search_album returned successfully for album_id={request.album_id}")
-        return serialize_response(result)
+        return await cached_call(
+            "search_album", request,
+            lambda: shazam.search_album(album_id=request.album_id),
+        )
+    except CircuitOpenError as e:
+        raise circuit_open_error(e)
     except Exception as e:
-        error_msg = str(e)
-        if "405" in error_msg or "Failed to decode json" in error_msg:
+        if is_endpoint_broken(e):
             logger.error(f"search_album endpoint is broken due to Shazam API changes (issue #145). album_id={request.album_id}")
             raise HTTPException(status_code=503, detail="This endpoint is currently unavailable due to Shazam API changes. See https://github.com/shazamio/ShazamIO/issues/145")
         logger.error(f"Error in search_album (album_id={request.album_id}, endpoint_country={request.endpoint_country}): {type(e).__name__}: {e}", exc_info=True)
@@ -396,15 +1138,18 @@ async def search_album(request: AlbumRequest) -> Dict[str, Any]:
 
 
 @app.post("/api/listening_counter")
-async def listening_counter(request: ListeningCounterRequest) -> Dict[str, Any]:
+async def listening_counter(request: ListeningCounterRequest) -> JSONBytesResponse:
     """Get listening counter for a track."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.listening_counter(track_id=request.track_id)
-        return serialize_response(result)
+        shazam = get_shazam(request.language, request.endpoint_country)
+        result = await app.state.circuits.call(
+            "listening_counter", lambda: shazam.listening_counter(track_id=request.track_id)
+        )
+        return JSONBytesResponse(serialize_response(result))
+    except CircuitOpenError as e:
+        raise circuit_open_error(e)
     except Exception as e:
-        error_msg = str(e)
-        if "405" in error_msg or "Failed to decode json" in error_msg:
+        if is_endpoint_broken(e):
             logger.error(f"listening_counter endpoint is broken due to Shazam API changes (issue #145). track_id={request.track_id}")
             raise HTTPException(status_code=503, detail="This endpoint is currently unavailable due to Shazam API changes. See https://github.com/shazamio/ShazamIO/issues/145")
         logger.error(f"Error in listening_counter (track_id={request.track_id}): {e}", exc_info=True)
@@ -412,12 +1157,17 @@ async def listening_counter(request: ListeningCounterRequest) -> Dict[str, Any]:
 
 
 @app.post("/api/listening_counter_many")
-async def listening_counter_many(request: ListeningCounterManyRequest) -> List[Dict[str, Any]]:
-    """Get listening counters for multiple tracks."""
+async def listening_counter_many(request: ListeningCounterManyRequest) -> JSONBytesResponse:
+    """Get listening counters for multiple tracks, with per-track errors."""
     try:
-        shazam = Shazam(language=request.language, endpoint_country=request.endpoint_country)
-        result = await shazam.listening_counter_many(track_ids=request.track_ids)
-        return serialize_response(result)
+        shazam = get_shazam(request.language, request.endpoint_country)
+        return JSONBytesResponse(await fetch_listening_counters(
+            shazam,
+            request.track_ids,
+            app.state.counter_cache,
+            options["listening_counter_cache_ttl"],
+            app.state.circuits,
+        ))
     except Exception as e:
         logger.error(f"Error in listening_counter_many: {e}")
         raise HTTPException(status_code=500, detail=str(e))
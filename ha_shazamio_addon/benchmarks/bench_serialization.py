@@ -0,0 +1,118 @@
+"""Benchmark response serialization for large chart payloads.
+
+Runs the add-on app in-process against a stubbed Shazam client that returns
+a synthetic 200-track chart, and reports requests per second for
+top_world_tracks with the response cache on (hits) and off (every request
+serialized from the upstream object).
+
+Each case is run twice on the same payload: through the add-on's current
+path (orjson bodies in a JSONBytesResponse) and through a baseline route
+that serializes the way the add-on did before (Factory.dump with a
+dict/str fallback, then FastAPI's response-model validation,
+jsonable_encoder and JSONResponse).
+
+Usage (from ha_shazamio_addon/, after pip install -r benchmarks/requirements.txt):
+    python benchmarks/bench_serialization.py [--requests 500]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_shazam import chart_payload  # noqa: E402
+
+
+def legacy_serialize(obj: Any) -> Dict[str, Any]:
+    """The add-on's serialize_response() before compiled dumpers and orjson."""
+    from dataclass_factory import Factory
+
+    try:
+        if hasattr(obj, "__dict__"):
+            return Factory().dump(obj, Dict[str, Any])
+        elif isinstance(obj, dict):
+            return obj
+        else:
+            return dict(obj)
+    except Exception:
+        return {"raw_response": str(obj)}
+
+
+def baseline_app(addon: Any, cache_ttl: int) -> Any:
+    """A FastAPI app serving top_world_tracks the way the add-on used to."""
+    from fastapi import FastAPI
+
+    baseline = FastAPI()
+    cache: Dict[str, Any] = {}
+
+    @baseline.post("/api/top_world_tracks")
+    async def top_world_tracks(request: addon.TracksRequest) -> Dict[str, Any]:
+        key = request.model_dump_json()
+        if cache_ttl and key in cache:
+            return cache[key]
+        shazam = addon.get_shazam(request.language, request.endpoint_country)
+        result = legacy_serialize(await shazam.top_world_tracks(limit=request.limit, offset=request.offset))
+        if cache_ttl:
+            cache[key] = result
+        return result
+
+    return baseline
+
+
+async def run(requests: int, cache_ttl: int, baseline: bool) -> float:
+    import httpx
+    import shazamio
+
+    import app as addon
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    payload = chart_payload()
+
+    async def top_world_tracks(self, limit=200, offset=0, proxy=None):
+        # Fresh object per call, as the upstream JSON decoder would produce
+        return json.loads(json.dumps(payload))
+
+    shazamio.Shazam.top_world_tracks = top_world_tracks
+    addon.RESPONSE_CACHE_TTLS["top_world_tracks"] = cache_ttl
+    target = baseline_app(addon, cache_ttl) if baseline else addon.app
+
+    async with addon.lifespan(addon.app):
+        transport = httpx.ASGITransport(app=target)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/api/top_world_tracks", json={})
+            start = time.perf_counter()
+            for _ in range(requests):
+                resp = await client.post("/api/top_world_tracks", json={})
+                resp.raise_for_status()
+            elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("SHAZAMIO_DATA_DIR", data_dir)
+    os.environ.setdefault("SHAZAMIO_OPTIONS_PATH", os.path.join(data_dir, "options.json"))
+    with open(os.environ["SHAZAMIO_OPTIONS_PATH"], "w") as f:
+        json.dump({"signature_workers": 0, "upstream_rate_limit": 0, "max_listeners": 1}, f)
+
+    print(f"top_world_tracks (200 tracks), {args.requests} requests")
+    print(f"{'':<12} {'baseline':>12} {'current':>12} {'speedup':>8}")
+    for label, ttl in (("cache hit", 900), ("cache miss", 0)):
+        before = asyncio.run(run(args.requests, ttl, baseline=True))
+        after = asyncio.run(run(args.requests, ttl, baseline=False))
+        print(f"{label:<12} {before:>8,.0f} r/s {after:>8,.0f} r/s {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Local stand-in for the Shazam and Apple Music endpoints the add-on calls.
+
+Serves canned chart, track, artist, album, search, listening counter and
+recognition responses over real HTTP, so benchmarks exercise the add-on's
+pooled client, rate limiter, retries and circuit breakers unchanged. Every
+response can be delayed and a share of them failed with a 503.
+
+Usage from a benchmark:
+
+    fake = FakeShazam(latency=0.05, error_rate=0.01)
+    await fake.start()
+    fake.patch_urls()   # point shazamio at the fake, after importing app
+    ...
+    await fake.stop()
+"""
+import asyncio
+import io
+import math
+import random
+import struct
+import wave
+import zlib
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+COUNTRIES = ("US", "GB", "DE", "FR")
+CITIES = ("New York", "London", "Berlin", "Paris")
+GENRES = ("pop", "hip-hop-rap", "dance", "electronic", "randb-soul", "alternative", "rock", "latin", "film-tv-stage", "country", "worldwide", "reggae-dancehall", "house", "k-pop")
+
+# Shazam hosts rewritten to the fake by patch_urls()
+SHAZAM_HOSTS = ("https://www.shazam.com", "https://amp.shazam.com", "https://cdn.shazam.com")
+
+
+def song(i: int) -> Dict[str, Any]:
+    """Apple Music song resource, as in charts, albums and amapi searches."""
+    return {
+        "id": str(1000000 + i),
+        "type": "songs",
+        "href": f"/v1/catalog/gb/songs/{1000000 + i}",
+        "attributes": {
+            "name": f"Track {i}",
+            "artistName": f"Artist {i % 50}",
+            "albumName": f"Album {i % 80}",
+            "genreNames": ["Pop", "Music"],
+            "durationInMillis": 180000 + i,
+            "releaseDate": "2024-01-01",
+            "isrc": f"GBABC24{i:05d}",
+            "url": f"https://music.apple.com/gb/album/x/{i}",
+            "artwork": {"width": 3000, "height": 3000, "url": "https://is1-ssl.mzstatic.com/{w}x{h}bb.jpg"},
+            "previews": [{"url": f"https://audio-ssl.itunes.apple.com/{i}.m4a"}],
+            "playParams": {"id": str(1000000 + i), "kind": "song"},
+            "hasLyrics": True,
+        },
+        "relationships": {
+            "artists": {"data": [{"id": str(i % 50), "type": "artists", "href": f"/v1/catalog/gb/artists/{i % 50}"}]},
+            "music-videos": {"data": []},
+        },
+    }
+
+
+def chart_payload(tracks: int = 200, offset: int = 0) -> Dict[str, Any]:
+    """Apple Music playlist tracks response, as returned for every top_* chart."""
+    return {
+        "data": [song(offset + i) for i in range(tracks)],
+        "next": f"/v1/catalog/gb/playlists/pl.x/tracks?offset={offset + tracks}",
+    }
+
+
+def shazam_track(key: int) -> Dict[str, Any]:
+    """Shazam v3 track, as in track_about, related tracks and recognition matches."""
+    return {
+        "layout": "5",
+        "type": "MUSIC",
+        "key": str(key),
+        "title": f"Track {key}",
+        "subtitle": f"Artist {key % 50}",
+        "images": {
+            "background": f"https://is1-ssl.mzstatic.com/artist/{key % 50}/800x800cc.jpg",
+            "coverart": f"https://is1-ssl.mzstatic.com/cover/{key}/400x400cc.jpg",
+            "coverarthq": f"https://is1-ssl.mzstatic.com/cover/{key}/400x400cc.jpg",
+        },
+        "share": {"subject": f"Track {key} - Artist {key % 50}", "href": f"https://www.shazam.com/track/{key}"},
+        "hub": {"type": "APPLEMUSIC", "actions": [{"name": "apple", "type": "applemusicplay", "id": str(key)}]},
+        "url": f"https://www.shazam.com/track/{key}",
+        "artists": [{"id": str(key % 50), "adamid": str(key % 50)}],
+        "genres": {"primary": "Pop"},
+        "sections": [
+            {
+                "type": "SONG",
+                "metadata": [
+                    {"title": "Album", "text": f"Album {key % 80}"},
+                    {"title": "Label", "text": "Label"},
+                    {"title": "Released", "text": "2024"},
+                ],
+            },
+            {"type": "LYRICS", "text": [f"Line {n} of track {key}" for n in range(40)]},
+        ],
+    }
+
+
+def locations() -> Dict[str, Any]:
+    """The charts/locations index that maps countries, cities and genres to playlist IDs."""
+    return {
+        "global": {
+            "top": {"listid": "pl.global-top"},
+            "genres": [{"urlName": genre, "listid": f"pl.global-{genre}"} for genre in GENRES],
+        },
+        "countries": [
+            {
+                "id": country,
+                "listid": f"pl.{country}-top",
+                "cities": [{"name": city, "listid": f"pl.{country}-{city}"} for city in CITIES],
+                "genres": [{"urlName": genre, "listid": f"pl.{country}-{genre}"} for genre in GENRES],
+            }
+            for country in COUNTRIES
+        ],
+    }
+
+
+def tone_wav(frequency: float, seconds: float = 12.0, sample_rate: int = 16000) -> bytes:
+    """A mono 16-bit WAV of a two-tone chord with a little noise, distinct per frequency."""
+    rng = random.Random(frequency)
+    frames = bytearray()
+    for n in range(int(seconds * sample_rate)):
+        t = n / sample_rate
+        value = 0.4 * math.sin(2 * math.pi * frequency * t) + 0.2 * math.sin(2 * math.pi * frequency * 1.5 * t)
+        value += rng.uniform(-0.05, 0.05)
+        frames += struct.pack("<h", int(max(-1.0, min(1.0, value)) * 32767))
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(bytes(frames))
+    return buf.getvalue()
+
+
+class FakeShazam:
+    """aiohttp server answering the upstream URLs shazamio builds."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.base_url = ""
+        self._runner: Optional[web.AppRunner] = None
+        self._original_urls: Dict[str, str] = {}
+
+    def _app(self) -> web.Application:
+        app = web.Application(middlewares=[self._delay_and_fail])
+        app.router.add_get("/services/charts/locations", self.locations)
+        app.router.add_get("/services/amapi/v1/catalog/{country}/playlists/{playlist}/tracks", self.playlist)
+        app.router.add_get("/services/amapi/v1/catalog/{country}/artists/{artist_id}", self.artist)
+        app.router.add_get("/services/amapi/v1/catalog/{country}/artists/{artist_id}/albums", self.artist_albums)
+        app.router.add_get("/services/amapi/v1/catalog/{country}/albums/{album_id}", self.album)
+        app.router.add_get("/services/amapi/v1/catalog/{country}/search", self.search)
+        app.router.add_get("/discovery/v5/{language}/{country}/web/-/track/{track_id}", self.track)
+        app.router.add_post("/discovery/v5/{language}/{country}/{device}/-/tag/{uuid_1}/{uuid_2}", self.recognize)
+        app.router.add_get("/shazam/v3/{language}/{country}/web/-/tracks/{similar}", self.related)
+        app.router.add_get("/services/count/v2/web/track", self.counters)
+        app.router.add_get("/services/count/v2/web/track/{track_id}", self.counter)
+        return app
+
+    @web.middleware
+    async def _delay_and_fail(self, request: web.Request, handler):
+        self.requests += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"errors": [{"status": "503"}]}, status=503)
+        return await handler(request)
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        self.restore_urls()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def patch_urls(self) -> None:
+        """Point every shazamio URL at this server (call after app has applied its own patches)."""
+        from shazamio.misc import ShazamUrl
+
+        for name, value in vars(ShazamUrl).items():
+            if isinstance(value, str) and value.startswith(SHAZAM_HOSTS):
+                self._original_urls[name] = value
+                for host in SHAZAM_HOSTS:
+                    value = value.replace(host, self.base_url)
+                setattr(ShazamUrl, name, value)
+
+    def restore_urls(self) -> None:
+        from shazamio.misc import ShazamUrl
+
+        for name, value in self._original_urls.items():
+            setattr(ShazamUrl, name, value)
+        self._original_urls.clear()
+
+    async def locations(self, request: web.Request) -> web.Response:
+        return web.json_response(locations())
+
+    async def playlist(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", 200))
+        offset = int(request.query.get("offset", 0))
+        return web.json_response(chart_payload(limit, offset))
+
+    async def artist(self, request: web.Request) -> web.Response:
+        artist_id = request.match_info["artist_id"]
+        return web.json_response({
+            "data": [{
+                "id": artist_id,
+                "type": "artists",
+                "attributes": {"name": f"Artist {artist_id}", "genreNames": ["Pop"], "url": f"https://music.apple.com/artist/{artist_id}"},
+                "views": {"top-songs": {"data": [song(int(artist_id) * 10 + i) for i in range(10)]}},
+            }],
+        })
+
+    async def artist_albums(self, request: web.Request) -> web.Response:
+        artist_id = int(request.match_info["artist_id"])
+        limit = int(request.query.get("limit", 10))
+        return web.json_response({
+            "data": [
+                {"id": str(artist_id * 100 + i), "type": "albums", "attributes": {"name": f"Album {i}", "artistName": f"Artist {artist_id}", "trackCount": 12}}
+                for i in range(limit)
+            ],
+        })
+
+    async def album(self, request: web.Request) -> web.Response:
+        album_id = request.match_info["album_id"]
+        return web.json_response({
+            "data": [{
+                "id": album_id,
+                "type": "albums",
+                "attributes": {"name": f"Album {album_id}", "artistName": "Artist", "trackCount": 12},
+                "relationships": {"tracks": {"data": [song(i) for i in range(12)]}},
+            }],
+        })
+
+    async def search(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", 10))
+        if request.query.get("types") == "artists":
+            artists = [{"id": str(i), "type": "artists", "attributes": {"name": f"Artist {i}"}} for i in range(limit)]
+            return web.json_response({"results": {"artists": {"data": artists}}})
+        return web.json_response({"results": {"songs": {"data": [song(i) for i in range(limit)]}}})
+
+    async def track(self, request: web.Request) -> web.Response:
+        return web.json_response(shazam_track(int(request.match_info["track_id"])))
+
+    async def recognize(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        # Stable match per signature, so repeated clips recognize as the same track
+        key = 40000000 + zlib.crc32(body["signature"]["uri"].encode()) % 1000
+        return web.json_response({
+            "matches": [{"id": str(key), "offset": 12.3, "timeskew": 0.0, "frequencyskew": 0.0}],
+            "timestamp": body.get("timestamp"),
+            "tagid": request.match_info["uuid_1"],
+            "track": shazam_track(key),
+        })
+
+    async def related(self, request: web.Request) -> web.Response:
+        size = int(request.query.get("pageSize", 20))
+        return web.json_response({"tracks": [shazam_track(50000000 + i) for i in range(size)]})
+
+    async def counters(self, request: web.Request) -> web.Response:
+        ids: List[str] = request.query.getall("id", [])
+        return web.json_response([{"id": track_id, "total": 1000 + int(track_id) % 1000, "type": "track"} for track_id in ids])
+
+    async def counter(self, request: web.Request) -> web.Response:
+        track_id = request.match_info["track_id"]
+        return web.json_response({"id": track_id, "total": 1000 + int(track_id) % 1000, "type": "track"})
@@ -0,0 +1,219 @@
+"""Load test every add-on API route against a local fake Shazam.
+
+Runs the add-on app in-process with its real Shazam client pool, rate
+limiter, caches and signature workers, pointed at the FakeShazam server
+from fake_shazam.py instead of shazam.com. Each route is driven with a
+fixed number of requests at a fixed concurrency, and latency percentiles,
+requests per second and the process's RSS are reported per route.
+
+IDs cycle through --id-space values, so the share of cache hits can be
+tuned (--no-cache turns the add-on's caches off). The fake server, the
+HTTP client and the app share one process and event loop; compare runs
+made with the same settings rather than reading the numbers as absolutes.
+
+Usage (from ha_shazamio_addon/, after pip install -r benchmarks/requirements.txt):
+    python benchmarks/load_test.py [--requests 200] [--concurrency 8]
+        [--routes top_world_tracks,recognize] [--upstream-latency 0.05]
+        [--upstream-error-rate 0.01] [--id-space 100] [--no-cache]
+        [--option signature_workers=0 ...]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_shazam import CITIES, COUNTRIES, FakeShazam, tone_wav  # noqa: E402
+
+# A request: (method, path, httpx request keyword arguments)
+Call = Tuple[str, str, Dict[str, Any]]
+
+
+def scenarios(clips: List[bytes], clip_paths: List[str], id_space: int) -> Dict[str, Callable[[int], Call]]:
+    """Request builders per route, keyed by the route's path without /api/."""
+
+    def ident(i: int) -> int:
+        return 1000 + i % id_space
+
+    def clip(i: int) -> bytes:
+        return clips[i % len(clips)]
+
+    return {
+        "status": lambda i: ("GET", "/api/status", {}),
+        "recognize": lambda i: ("POST", "/api/recognize", {"json": {"audio_data": base64.b64encode(clip(i)).decode(), "source": "bench"}}),
+        "recognize/stream": lambda i: ("POST", "/api/recognize/stream", {"content": clip(i), "params": {"source": "bench"}}),
+        "recognize_batch": lambda i: ("POST", "/api/recognize_batch", {"json": {"paths": [clip_paths[(i + n) % len(clip_paths)] for n in range(4)]}}),
+        "listen": lambda i: ("GET", "/api/listen", {}),
+        "history": lambda i: ("POST", "/api/history", {"json": {"limit": 50}}),
+        "history/top_artists": lambda i: ("POST", "/api/history/top_artists", {"json": {}}),
+        "history/play_counts": lambda i: ("POST", "/api/history/play_counts", {"json": {"source": "bench"}}),
+        "artist_about": lambda i: ("POST", "/api/artist_about", {"json": {"artist_id": ident(i)}}),
+        "track_about": lambda i: ("POST", "/api/track_about", {"json": {"track_id": ident(i)}}),
+        "search_artist": lambda i: ("POST", "/api/search_artist", {"json": {"query": f"artist {ident(i)}"}}),
+        "search_track": lambda i: ("POST", "/api/search_track", {"json": {"query": f"track {ident(i)}"}}),
+        "related_tracks": lambda i: ("POST", "/api/related_tracks", {"json": {"track_id": ident(i)}}),
+        "top_world_tracks": lambda i: ("POST", "/api/top_world_tracks", {"json": {"offset": i % id_space}}),
+        "top_country_tracks": lambda i: ("POST", "/api/top_country_tracks", {"json": {"country_code": COUNTRIES[i % len(COUNTRIES)], "offset": i % id_space}}),
+        "top_city_tracks": lambda i: ("POST", "/api/top_city_tracks", {"json": {"country_code": COUNTRIES[i % len(COUNTRIES)], "city_name": CITIES[i % len(CITIES)], "offset": i % id_space}}),
+        "top_world_genre_tracks": lambda i: ("POST", "/api/top_world_genre_tracks", {"json": {"genre": "pop", "offset": i % id_space}}),
+        "top_country_genre_tracks": lambda i: ("POST", "/api/top_country_genre_tracks", {"json": {"country_code": "US", "genre": "pop", "offset": i % id_space}}),
+        "artist_albums": lambda i: ("POST", "/api/artist_albums", {"json": {"artist_id": ident(i)}}),
+        "search_album": lambda i: ("POST", "/api/search_album", {"json": {"album_id": ident(i)}}),
+        "listening_counter": lambda i: ("POST", "/api/listening_counter", {"json": {"track_id": ident(i)}}),
+        "listening_counter_many": lambda i: ("POST", "/api/listening_counter_many", {"json": {"track_ids": [ident(i + n) for n in range(100)]}}),
+        "metrics": lambda i: ("GET", "/metrics", {}),
+    }
+
+
+def rss_mb() -> Tuple[float, float]:
+    """Current and peak resident set size of this process, in MB."""
+    current = 0.0
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return current, peak
+
+
+async def drive(client, build: Callable[[int], Call], requests: int, concurrency: int) -> Tuple[List[float], int, float]:
+    """Send requests from concurrency workers; return latencies, error count and wall time."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            method, path, kwargs = build(i)
+            start = time.perf_counter()
+            resp = await client.request(method, path, **kwargs)
+            await resp.aread()
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentiles(latencies: List[float]) -> Tuple[float, float, float]:
+    if len(latencies) < 2:
+        value = latencies[0] if latencies else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+async def run(args: argparse.Namespace, clips: List[bytes], clip_paths: List[str]) -> None:
+    import httpx
+
+    # Before app's own basicConfig, so per-request INFO logs stay quiet
+    logging.basicConfig(level=logging.WARNING)
+    import app as addon
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.no_cache:
+        for endpoint in addon.RESPONSE_CACHE_TTLS:
+            addon.RESPONSE_CACHE_TTLS[endpoint] = 0
+
+    builders = scenarios(clips, clip_paths, args.id_space)
+    routes = args.routes.split(",") if args.routes else list(builders)
+    unknown = [route for route in routes if route not in builders]
+    if unknown:
+        raise SystemExit(f"Unknown routes: {', '.join(unknown)} (known: {', '.join(builders)})")
+
+    fake = FakeShazam(latency=args.upstream_latency, jitter=args.upstream_jitter, error_rate=args.upstream_error_rate)
+    await fake.start()
+    fake.patch_urls()
+
+    try:
+        async with addon.lifespan(addon.app):
+            transport = httpx.ASGITransport(app=addon.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                print(f"{'route':<26} {'ok':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rss MB':>7}")
+                for route in routes:
+                    latencies, errors, elapsed = await drive(client, builders[route], args.requests, args.concurrency)
+                    p50, p95, p99 = percentiles(latencies)
+                    current, _ = rss_mb()
+                    print(
+                        f"{route:<26} {len(latencies) - errors:>6} {errors:>6} {len(latencies) / elapsed:>9,.1f} "
+                        f"{p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {p99 * 1000:>8.1f} {current:>7.0f}"
+                    )
+    finally:
+        await fake.stop()
+
+    current, peak = rss_mb()
+    print(f"\nupstream: {fake.requests} requests, {fake.errors} injected errors")
+    print(f"rss: {current:.0f} MB now, {peak:.0f} MB peak")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--routes", default="", help="Comma-separated routes (default: all)")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Seconds the fake Shazam takes per response")
+    parser.add_argument("--upstream-jitter", type=float, default=0.02, help="Extra random seconds per response, up to this much")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="Share of fake Shazam responses that are 503s")
+    parser.add_argument("--id-space", type=int, default=100, help="Distinct IDs, offsets and queries per route")
+    parser.add_argument("--clips", type=int, default=8, help="Distinct audio clips for the recognition routes")
+    parser.add_argument("--no-cache", action="store_true", help="Turn off the response, recognition and counter caches and the metadata store")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE", help="Add-on option override (JSON value), repeatable")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    bench_options: Dict[str, Any] = {"upstream_rate_limit": 0, "log_level": "warning"}
+    if args.no_cache:
+        bench_options.update({
+            "recognition_cache_ttl": 0,
+            "listening_counter_cache_ttl": 0,
+            "metadata_store": False,
+        })
+    for entry in args.option:
+        key, _, value = entry.partition("=")
+        try:
+            bench_options[key] = json.loads(value)
+        except ValueError:
+            bench_options[key] = value
+
+    os.environ["SHAZAMIO_DATA_DIR"] = data_dir
+    # Batch clips are written here rather than to /media
+    os.environ["SHAZAMIO_MEDIA_ROOTS"] = data_dir
+    os.environ["SHAZAMIO_OPTIONS_PATH"] = os.path.join(data_dir, "options.json")
+    with open(os.environ["SHAZAMIO_OPTIONS_PATH"], "w") as f:
+        json.dump(bench_options, f)
+
+    clips = [tone_wav(220.0 * (1 + n / 7)) for n in range(args.clips)]
+    clip_paths = []
+    for n, clip in enumerate(clips):
+        path = os.path.join(data_dir, f"clip{n}.wav")
+        with open(path, "wb") as f:
+            f.write(clip)
+        clip_paths.append(path)
+
+    print(
+        f"{args.requests} requests per route at concurrency {args.concurrency}, "
+        f"upstream latency {args.upstream_latency * 1000:.0f}+{args.upstream_jitter * 1000:.0f} ms, "
+        f"error rate {args.upstream_error_rate:.0%}, id space {args.id_space}, "
+        f"cache {'off' if args.no_cache else 'on'}\n"
+    )
+    asyncio.run(run(args, clips, clip_paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Per-endpoint circuit breakers for upstream endpoints Shazam has broken.
+
+Some endpoints answer 405 or non-JSON since Shazam changed its API (see
+https://github.com/shazamio/ShazamIO/issues/145). After a few such failures
+in a row a breaker opens and calls fail fast for a cool-down; then a single
+probe request decides whether it closes again.
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_endpoint_broken(error: Exception) -> bool:
+    """Whether an upstream error is the issue #145 breakage rather than a transient failure."""
+    message = str(error)
+    return "405" in message or "Failed to decode json" in message
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's breaker is open; retry after retry_after seconds."""
+
+    def __init__(self, endpoint: str, retry_after: int):
+        super().__init__(f"{endpoint} is unavailable upstream, retry in {retry_after}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Breaker for one endpoint. Only is_endpoint_broken() failures count."""
+
+    def __init__(self, endpoint: str, failure_threshold: int = 3, cooldown: float = 300.0):
+        self.endpoint = endpoint
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self.rejected = 0
+        self.trips = 0
+
+    def _retry_after(self) -> int:
+        remaining = self.cooldown - (time.monotonic() - (self.opened_at or 0))
+        return max(1, int(remaining + 0.999))
+
+    def _before_call(self) -> None:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                self.rejected += 1
+                raise CircuitOpenError(self.endpoint, self._retry_after())
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probing:
+                # Another request is already probing; don't pile on
+                self.rejected += 1
+                raise CircuitOpenError(self.endpoint, 1)
+            self._probing = True
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn through the breaker, raising CircuitOpenError while it is open."""
+        self._before_call()
+        probe = self.state == HALF_OPEN
+        try:
+            result = await fn()
+        except Exception as e:
+            if is_endpoint_broken(e):
+                self.failures += 1
+                if probe or self.failures >= self.failure_threshold:
+                    self._open()
+            raise
+        else:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            return result
+        finally:
+            if probe:
+                self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return breaker state and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": self._retry_after() if self.state == OPEN else None,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakers:
+    """Registry of breakers for a fixed set of endpoints."""
+
+    def __init__(self, endpoints, failure_threshold: int = 3, cooldown: float = 300.0):
+        self._breakers = {
+            endpoint: CircuitBreaker(endpoint, failure_threshold, cooldown) for endpoint in endpoints
+        }
+
+    async def call(self, endpoint: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn through the endpoint's breaker, or directly if it has none."""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            return await fn()
+        return await breaker.call(fn)
+
+    def stats(self) -> Dict[str, Any]:
+        return {endpoint: breaker.stats() for endpoint, breaker in self._breakers.items()}
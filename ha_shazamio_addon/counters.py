@@ -0,0 +1,121 @@
+"""Chunked, concurrent fan-out for listening counters."""
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+from shazamio import Shazam
+
+from breaker import CircuitBreakers, CircuitOpenError, is_endpoint_broken
+from cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# IDs per upstream listening_counter_many call
+CHUNK_SIZE = 50
+# Upstream calls in flight at once per request
+MAX_CONCURRENT_CHUNKS = 4
+# Single-ID fallback calls in flight at once per request
+MAX_CONCURRENT_SINGLE_IDS = 4
+# Breaker shared with /api/listening_counter; both call the same upstream
+BREAKER_ENDPOINT = "listening_counter"
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+async def _fetch_chunk(
+    shazam: Shazam,
+    chunk: List[int],
+    circuits: CircuitBreakers,
+    single_ids: asyncio.Semaphore,
+) -> Tuple[Dict[int, Any], Dict[int, str]]:
+    """Fetch one chunk; if the batch call fails, isolate the bad IDs one by one.
+
+    When the endpoint is broken upstream (or its breaker is open) every ID
+    would fail too, so the whole chunk is marked failed instead.
+    """
+    try:
+        items = await circuits.call(BREAKER_ENDPOINT, lambda: shazam.listening_counter_many(track_ids=chunk))
+    except Exception as e:
+        if isinstance(e, CircuitOpenError) or is_endpoint_broken(e):
+            logger.warning(f"listening_counter_many failed for {len(chunk)} ids ({e}), not retrying")
+            return {}, {track_id: _error(e) for track_id in chunk}
+        logger.warning(f"listening_counter_many failed for {len(chunk)} ids ({e}), retrying individually")
+        return await _fetch_individually(shazam, chunk, circuits, single_ids)
+
+    counters: Dict[int, Any] = {}
+    for item in items or []:
+        try:
+            counters[int(item["id"])] = item
+        except (KeyError, TypeError, ValueError):
+            continue
+    errors = {track_id: "Not returned by upstream" for track_id in chunk if track_id not in counters}
+    return counters, errors
+
+
+async def _fetch_individually(
+    shazam: Shazam,
+    chunk: List[int],
+    circuits: CircuitBreakers,
+    single_ids: asyncio.Semaphore,
+) -> Tuple[Dict[int, Any], Dict[int, str]]:
+    async def fetch_one(track_id: int) -> Any:
+        async with single_ids:
+            return await circuits.call(BREAKER_ENDPOINT, lambda: shazam.listening_counter(track_id=track_id))
+
+    results = await asyncio.gather(*(fetch_one(track_id) for track_id in chunk), return_exceptions=True)
+    counters: Dict[int, Any] = {}
+    errors: Dict[int, str] = {}
+    for track_id, result in zip(chunk, results):
+        if isinstance(result, Exception):
+            errors[track_id] = _error(result)
+        else:
+            counters[track_id] = result
+    return counters, errors
+
+
+async def fetch_listening_counters(
+    shazam: Shazam,
+    track_ids: List[int],
+    cache: TTLCache,
+    ttl: float,
+    circuits: CircuitBreakers,
+) -> Dict[str, Any]:
+    """Return counters for track_ids with per-ID errors instead of failing the whole call.
+
+    Duplicate IDs are fetched once and cached counters are served locally;
+    the rest are split into chunks fetched concurrently. Upstream calls go
+    through the listening_counter circuit breaker.
+    """
+    unique_ids = list(dict.fromkeys(track_ids))
+    counters: Dict[int, Any] = {}
+    errors: Dict[int, str] = {}
+
+    missing: List[int] = []
+    for track_id in unique_ids:
+        value = cache.get(("listening_counter", track_id))
+        if value is MISSING:
+            missing.append(track_id)
+        else:
+            counters[track_id] = value
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+    single_ids = asyncio.Semaphore(MAX_CONCURRENT_SINGLE_IDS)
+
+    async def run_chunk(chunk: List[int]) -> Tuple[Dict[int, Any], Dict[int, str]]:
+        async with semaphore:
+            return await _fetch_chunk(shazam, chunk, circuits, single_ids)
+
+    chunks = [missing[i:i + CHUNK_SIZE] for i in range(0, len(missing), CHUNK_SIZE)]
+    for chunk_counters, chunk_errors in await asyncio.gather(*(run_chunk(c) for c in chunks)):
+        for track_id, value in chunk_counters.items():
+            cache.set(("listening_counter", track_id), value, ttl)
+        counters.update(chunk_counters)
+        errors.update(chunk_errors)
+
+    return {
+        "results": [counters[track_id] for track_id in unique_ids if track_id in counters],
+        "errors": {str(track_id): message for track_id, message in errors.items()},
+        "cached": len(unique_ids) - len(missing),
+    }
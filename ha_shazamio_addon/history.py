@@ -0,0 +1,353 @@
+"""Append-only recognition history in SQLite.
+
+Every matched recognition is stored as one row with its time, Shazam track
+key, title, artist and the device or listener it came from, indexed for
+range queries by time, track, artist and source. A per-day rollup is kept
+alongside, so top-artist and play-count queries read one row per track per
+day for whole days and only touch raw rows for the partial days at either
+end of the range.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recognitions (
+    id INTEGER PRIMARY KEY,
+    recognized_at REAL NOT NULL,
+    track_key TEXT NOT NULL,
+    title TEXT,
+    artist TEXT,
+    source TEXT,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS recognitions_time ON recognitions (recognized_at, artist, track_key);
+CREATE INDEX IF NOT EXISTS recognitions_track ON recognitions (track_key, recognized_at);
+CREATE INDEX IF NOT EXISTS recognitions_artist ON recognitions (artist, recognized_at);
+CREATE INDEX IF NOT EXISTS recognitions_source ON recognitions (source, recognized_at, artist, track_key);
+CREATE TABLE IF NOT EXISTS daily_plays (
+    day INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    track_key TEXT NOT NULL,
+    title TEXT,
+    plays INTEGER NOT NULL,
+    last_at REAL NOT NULL,
+    PRIMARY KEY (day, source, artist, track_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS daily_plays_source ON daily_plays (source, day);
+CREATE INDEX IF NOT EXISTS daily_plays_artist ON daily_plays (artist, day);
+CREATE INDEX IF NOT EXISTS daily_plays_track ON daily_plays (track_key, day);
+"""
+
+# Rollup granularity: daily_plays holds one row per UTC day, source, artist
+# and track, updated in the same transaction as each insert
+DAY = 86400
+
+# Rows deleted per transaction when pruning, so a large prune doesn't hold
+# the write lock for long
+PRUNE_BATCH = 10000
+
+
+def history_entry(result: Dict[str, Any], source: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Extract the indexed fields from a recognition result, or None if it didn't match."""
+    track = result.get("track") if isinstance(result, dict) else None
+    if not isinstance(track, dict) or not track.get("key"):
+        return None
+    return {
+        "track_key": str(track["key"]),
+        "title": track.get("title"),
+        "artist": track.get("subtitle"),
+        "source": source,
+    }
+
+
+def _where(
+    start: Optional[float],
+    end: Optional[float],
+    source: Optional[str] = None,
+    artist: Optional[str] = None,
+    track_key: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, value in (("source", source), ("artist", artist), ("track_key", track_key)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if start is not None:
+        clauses.append("recognized_at >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("recognized_at < ?")
+        params.append(end)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _plays_query(
+    start: Optional[float],
+    end: Optional[float],
+    source: Optional[str] = None,
+    artist: Optional[str] = None,
+    track_keys: Optional[List[str]] = None,
+) -> Tuple[str, List[Any]]:
+    """Build a (track_key, title, artist, plays, last_at) subquery over a time range.
+
+    Whole UTC days come from daily_plays; the partial days at each end of the
+    range come from the raw recognitions table.
+    """
+    filters: List[str] = []
+    filter_params: List[Any] = []
+    if source is not None:
+        filters.append("source = ?")
+        filter_params.append(source)
+    if artist is not None:
+        filters.append("artist = ?")
+        filter_params.append(artist)
+    if track_keys:
+        filters.append(f"track_key IN ({', '.join('?' * len(track_keys))})")
+        filter_params += list(track_keys)
+
+    first_day = math.ceil(start / DAY) if start is not None else None
+    end_day = math.floor(end / DAY) if end is not None else None
+    raw_ranges: List[Tuple[Optional[float], Optional[float]]] = []
+    if first_day is not None and end_day is not None and first_day >= end_day:
+        # Less than a whole day: everything comes from raw rows
+        raw_ranges.append((start, end))
+        use_rollup = False
+    else:
+        use_rollup = True
+        if start is not None and start < first_day * DAY:
+            raw_ranges.append((start, first_day * DAY))
+        if end is not None and end > end_day * DAY:
+            raw_ranges.append((end_day * DAY, end))
+
+    parts: List[str] = []
+    params: List[Any] = []
+    if use_rollup:
+        clauses = list(filters)
+        params += filter_params
+        if first_day is not None:
+            clauses.append("day >= ?")
+            params.append(first_day)
+        if end_day is not None:
+            clauses.append("day < ?")
+            params.append(end_day)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        parts.append(f"SELECT track_key, title, artist, plays, last_at FROM daily_plays{where}")
+    for range_start, range_end in raw_ranges:
+        clauses = list(filters)
+        params += filter_params
+        if range_start is not None:
+            clauses.append("recognized_at >= ?")
+            params.append(range_start)
+        if range_end is not None:
+            clauses.append("recognized_at < ?")
+            params.append(range_end)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        parts.append(
+            "SELECT track_key, title, COALESCE(artist, '') AS artist, 1 AS plays, recognized_at AS last_at "
+            f"FROM recognitions{where}"
+        )
+    return " UNION ALL ".join(parts), params
+
+
+class HistoryStore:
+    """Thread-safe SQLite history; async methods run queries in a worker thread."""
+
+    def __init__(self, path: str, store_payload: bool = True):
+        self.path = path
+        self.store_payload = store_payload
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.recorded = 0
+        self.queries = 0
+
+    @classmethod
+    def open(cls, data_dir: str, filename: str = "history.db", **kwargs: Any) -> Optional["HistoryStore"]:
+        """Open the history in data_dir, or return None if it is not writable."""
+        if not os.path.isdir(data_dir):
+            logger.warning(f"Data directory {data_dir} does not exist, recognition history disabled")
+            return None
+        try:
+            return cls(os.path.join(data_dir, filename), **kwargs)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open recognition history in {data_dir}: {e}")
+            return None
+
+    def _query(self, sql: str, params: List[Any]) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _record(self, entry: Dict[str, Any], payload: Optional[str], recognized_at: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO recognitions (recognized_at, track_key, title, artist, source, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (recognized_at, entry["track_key"], entry["title"], entry["artist"], entry["source"], payload),
+            )
+            self._conn.execute(
+                "INSERT INTO daily_plays (day, source, artist, track_key, title, plays, last_at) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT (day, source, artist, track_key) DO UPDATE SET "
+                "plays = plays + 1, title = excluded.title, last_at = MAX(last_at, excluded.last_at)",
+                (
+                    math.floor(recognized_at / DAY),
+                    entry["source"] or "",
+                    entry["artist"] or "",
+                    entry["track_key"],
+                    entry["title"],
+                    recognized_at,
+                ),
+            )
+        return cursor.lastrowid
+
+    def _prune(self, max_age: float) -> int:
+        # Prune on a day boundary so raw rows and the rollup drop together
+        cutoff_day = math.floor((time.time() - max_age) / DAY)
+        cutoff = cutoff_day * DAY
+        removed = 0
+        while True:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM recognitions WHERE id IN "
+                    "(SELECT id FROM recognitions WHERE recognized_at < ? LIMIT ?)",
+                    (cutoff, PRUNE_BATCH),
+                )
+            removed += cursor.rowcount
+            if cursor.rowcount < PRUNE_BATCH:
+                break
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM daily_plays WHERE day < ?", (cutoff_day,))
+        return removed
+
+    async def record(
+        self,
+        result: Dict[str, Any],
+        source: Optional[str] = None,
+        recognized_at: Optional[float] = None,
+    ) -> Optional[int]:
+        """Append a recognition result; unmatched results are ignored. Returns the row ID."""
+        entry = history_entry(result, source)
+        if entry is None:
+            return None
+        payload = json.dumps(result) if self.store_payload else None
+        self.recorded += 1
+        return await asyncio.to_thread(self._record, entry, payload, recognized_at or time.time())
+
+    async def prune(self, max_age: float) -> int:
+        """Delete rows older than max_age seconds; return how many were removed."""
+        return await asyncio.to_thread(self._prune, max_age)
+
+    async def recognitions(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        source: Optional[str] = None,
+        artist: Optional[str] = None,
+        track_key: Optional[str] = None,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        include_payload: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Return recognitions in a time range, newest first.
+
+        Pass the last row's ID as before_id to page through large ranges
+        without OFFSET scans.
+        """
+        where, params = _where(start, end, source, artist, track_key)
+        if before_id is not None:
+            where += (" AND" if where else " WHERE") + " id < ?"
+            params.append(before_id)
+        columns = "id, recognized_at, track_key, title, artist, source"
+        if include_payload:
+            columns += ", payload"
+        sql = f"SELECT {columns} FROM recognitions{where} ORDER BY recognized_at DESC, id DESC LIMIT ?"
+        self.queries += 1
+        rows = await asyncio.to_thread(self._query, sql, params + [limit])
+
+        items = []
+        for row in rows:
+            item = {
+                "id": row[0],
+                "recognized_at": row[1],
+                "track_key": row[2],
+                "title": row[3],
+                "artist": row[4],
+                "source": row[5],
+            }
+            if include_payload:
+                item["data"] = json.loads(row[6]) if row[6] else None
+            items.append(item)
+        return items
+
+    async def top_artists(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        source: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Return the most recognized artists in a time range."""
+        plays, params = _plays_query(start, end, source=source)
+        sql = (
+            f"SELECT artist, SUM(plays) AS total, COUNT(DISTINCT track_key) FROM ({plays}) "
+            f"WHERE artist != '' GROUP BY artist ORDER BY total DESC, artist LIMIT ?"
+        )
+        self.queries += 1
+        rows = await asyncio.to_thread(self._query, sql, params + [limit])
+        return [{"artist": artist, "plays": total, "tracks": tracks} for artist, total, tracks in rows]
+
+    async def play_counts(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        source: Optional[str] = None,
+        artist: Optional[str] = None,
+        track_keys: Optional[List[str]] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Return play counts per track in a time range, most played first.
+
+        With track_keys, counts only those tracks; otherwise returns the top
+        tracks.
+        """
+        plays, params = _plays_query(start, end, source=source, artist=artist, track_keys=track_keys)
+        sql = (
+            f"SELECT track_key, MAX(title), MAX(artist), SUM(plays) AS total, MAX(last_at) FROM ({plays}) "
+            f"GROUP BY track_key ORDER BY total DESC, track_key LIMIT ?"
+        )
+        self.queries += 1
+        rows = await asyncio.to_thread(self._query, sql, params + [limit])
+        return [
+            {
+                "track_key": key,
+                "title": title,
+                "artist": artist or None,
+                "plays": total,
+                "last_recognized_at": last,
+            }
+            for key, title, artist, total, last in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return history counters."""
+        with self._lock:
+            # MAX(id) is a single rowid lookup; COUNT(*) would scan the table
+            (last_id,) = self._conn.execute("SELECT MAX(id) FROM recognitions").fetchone()
+        return {"path": self.path, "last_id": last_id, "recorded": self.recorded, "queries": self.queries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
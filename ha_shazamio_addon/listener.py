@@ -0,0 +1,298 @@
+"""Continuous recognition of live audio streams.
+
+A listener decodes its source with ffmpeg into 16 kHz mono PCM, recognizes
+a sliding window every hop, and publishes an event only when the
+recognized track changes.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from aiohttp import ClientSession, ClientTimeout
+
+from preprocessing import SAMPLE_RATE, SAMPLE_WIDTH, pcm_to_wav
+from scheduler import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPE = "ha_shazamio_response"
+SUPERVISOR_EVENTS_URL = "http://supervisor/core/api/events"
+# ffmpeg stderr lines kept for a failed listener's error message
+STDERR_TAIL_LINES = 20
+
+# Sources a listener accepts: these URL schemes, or files given as file:<path>
+STREAM_SCHEMES = ("http", "https", "rtsp")
+# ffmpeg -protocol_whitelist per kind of source, including the protocols
+# the stream ones are layered on
+STREAM_PROTOCOLS = "http,https,tcp,tls,crypto,rtsp,rtp,udp"
+FILE_PROTOCOLS = "file"
+
+RecognizeWindow = Callable[[str, str, bytes], Awaitable[Dict[str, Any]]]
+TrackChanged = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def track_key(result: Dict[str, Any]) -> Optional[str]:
+    """Return the Shazam track key of a recognition result, if it matched."""
+    track = result.get("track") if isinstance(result, dict) else None
+    return track.get("key") if isinstance(track, dict) else None
+
+
+class EventPublisher:
+    """Fire events on the Home Assistant bus through the Supervisor Core API."""
+
+    def __init__(self):
+        self._token = os.environ.get("SUPERVISOR_TOKEN")
+        self._session: Optional[ClientSession] = None
+        if not self._token:
+            logger.warning("SUPERVISOR_TOKEN not set, listener events will only be logged")
+
+    async def publish(self, event_data: Dict[str, Any]) -> None:
+        if not self._token:
+            logger.info(f"Listener event (not published): {event_data}")
+            return
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(timeout=ClientTimeout(total=10))
+        try:
+            async with self._session.post(
+                f"{SUPERVISOR_EVENTS_URL}/{EVENT_TYPE}",
+                json=event_data,
+                headers={"Authorization": f"Bearer {self._token}"},
+            ) as resp:
+                resp.raise_for_status()
+        except Exception as e:
+            logger.error(f"Could not publish listener event: {e}")
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class StreamListener:
+    """Recognize sliding windows of one audio source."""
+
+    def __init__(
+        self,
+        listener_id: str,
+        source: str,
+        language: str,
+        endpoint_country: str,
+        window_seconds: float,
+        hop_seconds: float,
+        realtime: bool,
+        pcm_sample_rate: Optional[int],
+        pcm_channels: int,
+        recognize: RecognizeWindow,
+        publisher: EventPublisher,
+        on_change: Optional[TrackChanged] = None,
+    ):
+        self.listener_id = listener_id
+        self.source = source
+        self.language = language
+        self.endpoint_country = endpoint_country
+        self.window_seconds = window_seconds
+        self.hop_seconds = hop_seconds
+        self.realtime = realtime
+        self.pcm_sample_rate = pcm_sample_rate
+        self.pcm_channels = pcm_channels
+        self._recognize = recognize
+        self._publisher = publisher
+        self._on_change = on_change
+        self._task: Optional[asyncio.Task] = None
+        self._recognition: Optional[asyncio.Task] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.current_key: Optional[str] = None
+        self.started_at = time.time()
+        self.windows = 0
+        self.skipped = 0
+        self.changes = 0
+
+    def _ffmpeg_args(self) -> List[str]:
+        protocols = FILE_PROTOCOLS if self.source.startswith("file:") else STREAM_PROTOCOLS
+        args = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-protocol_whitelist", protocols]
+        if self.realtime:
+            args.append("-re")
+        if self.pcm_sample_rate:
+            args += ["-f", "s16le", "-ar", str(self.pcm_sample_rate), "-ac", str(self.pcm_channels)]
+        args += ["-i", self.source, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+        return args
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.state = "stopped"
+
+    async def _drain_stderr(self, lines: Deque[str]) -> None:
+        """Keep reading ffmpeg's stderr so a chatty source can't fill the pipe and stall it."""
+        async for line in self._process.stderr:
+            lines.append(line.decode(errors="replace").rstrip())
+
+    async def _run(self) -> None:
+        window_bytes = int(self.window_seconds * SAMPLE_RATE) * SAMPLE_WIDTH
+        hop_bytes = int(self.hop_seconds * SAMPLE_RATE) * SAMPLE_WIDTH
+        buffer = bytearray()
+        since_last = 0
+        # Last ffmpeg log lines, for the error message if it fails
+        stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        stderr_task: Optional[asyncio.Task] = None
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self._ffmpeg_args(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stderr_task = asyncio.create_task(self._drain_stderr(stderr_tail))
+            self.state = "running"
+            logger.info(f"Listener {self.listener_id} started on {self.source}")
+
+            while True:
+                chunk = await self._process.stdout.read(hop_bytes)
+                if not chunk:
+                    break
+                buffer.extend(chunk)
+                if len(buffer) > window_bytes:
+                    del buffer[: len(buffer) - window_bytes]
+                since_last += len(chunk)
+                if since_last >= hop_bytes and len(buffer) >= min(window_bytes, hop_bytes * 2):
+                    since_last = 0
+                    self._submit_window(bytes(buffer))
+
+            returncode = await self._process.wait()
+            await stderr_task
+            if returncode != 0:
+                stderr = "\n".join(stderr_tail).strip()
+                raise RuntimeError(f"ffmpeg exited with {returncode}: {stderr[-500:]}")
+            if self._recognition is not None:
+                await self._recognition
+            self.state = "finished"
+            logger.info(f"Listener {self.listener_id} reached end of stream")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Listener {self.listener_id} failed: {e}")
+        finally:
+            if self._process is not None and self._process.returncode is None:
+                self._process.kill()
+                await self._process.wait()
+            if stderr_task is not None and not stderr_task.done():
+                stderr_task.cancel()
+            if self._recognition is not None and not self._recognition.done():
+                self._recognition.cancel()
+
+    def _submit_window(self, pcm: bytes) -> None:
+        """Recognize a window unless the previous one is still running."""
+        if self._recognition is not None and not self._recognition.done():
+            self.skipped += 1
+            return
+        self.windows += 1
+        self._recognition = asyncio.create_task(self._recognize_window(pcm))
+
+    async def _recognize_window(self, pcm: bytes) -> None:
+        try:
+            result = await self._recognize(self.language, self.endpoint_country, pcm_to_wav(pcm))
+        except QueueFullError:
+            self.skipped += 1
+            return
+        except Exception as e:
+            logger.warning(f"Listener {self.listener_id} window failed: {e}")
+            return
+
+        key = track_key(result)
+        if key is None or key == self.current_key:
+            return
+        self.current_key = key
+        self.changes += 1
+        if self._on_change is not None:
+            try:
+                await self._on_change(self.listener_id, result)
+            except Exception as e:
+                logger.warning(f"Listener {self.listener_id} track change hook failed: {e}")
+        await self._publisher.publish({
+            "service": "listen",
+            "listener_id": self.listener_id,
+            "source": self.source,
+            "data": result,
+        })
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "listener_id": self.listener_id,
+            "source": self.source,
+            "state": self.state,
+            "error": self.error,
+            "current_track_key": self.current_key,
+            "window_seconds": self.window_seconds,
+            "hop_seconds": self.hop_seconds,
+            "windows": self.windows,
+            "skipped": self.skipped,
+            "changes": self.changes,
+            "started_at": self.started_at,
+        }
+
+
+class ListenerManager:
+    """Registry of running stream listeners."""
+
+    def __init__(
+        self,
+        recognize: RecognizeWindow,
+        max_listeners: int = 4,
+        on_change: Optional[TrackChanged] = None,
+    ):
+        self._recognize = recognize
+        self._on_change = on_change
+        self.max_listeners = max_listeners
+        self.publisher = EventPublisher()
+        self._listeners: Dict[str, StreamListener] = {}
+
+    def _active(self) -> List[StreamListener]:
+        return [l for l in self._listeners.values() if l.state in ("starting", "running")]
+
+    def start(self, listener_id: Optional[str] = None, **kwargs: Any) -> StreamListener:
+        """Start a listener, replacing a finished one with the same id."""
+        listener_id = listener_id or uuid.uuid4().hex[:8]
+        existing = self._listeners.get(listener_id)
+        if existing is not None and existing.state in ("starting", "running"):
+            raise ValueError(f"Listener {listener_id} is already running")
+        if len(self._active()) >= self.max_listeners:
+            raise ValueError(f"At most {self.max_listeners} listeners can run at once")
+
+        listener = StreamListener(
+            listener_id=listener_id,
+            recognize=self._recognize,
+            publisher=self.publisher,
+            on_change=self._on_change,
+            **kwargs,
+        )
+        self._listeners[listener_id] = listener
+        listener.start()
+        return listener
+
+    async def stop(self, listener_id: str) -> Optional[StreamListener]:
+        listener = self._listeners.pop(listener_id, None)
+        if listener is not None:
+            await listener.stop()
+        return listener
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [l.status() for l in self._listeners.values()]
+
+    async def close(self) -> None:
+        for listener_id in list(self._listeners):
+            await self.stop(listener_id)
+        await self.publisher.close()
@@ -0,0 +1,169 @@
+"""Prometheus metrics for the add-on API.
+
+Metrics are plain in-process counters rendered in the Prometheus text
+exposition format on /metrics. Request counts, in-flight requests and
+latency are recorded for every route by middleware; the time spent in each
+phase of a request (decoding audio, computing its signature, waiting on
+Shazam, serializing the response) is recorded where that work happens,
+labelled with the endpoint the request was made to.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from ratelimit import upstream_endpoint
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (sub-millisecond) up to slow recognitions
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        counts = entry[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+requests_total = Counter(
+    "shazamio_requests_total", "API requests by endpoint and response status.", ("endpoint", "status")
+)
+requests_in_flight = Gauge(
+    "shazamio_requests_in_flight", "API requests currently being handled.", ("endpoint",)
+)
+request_seconds = Histogram(
+    "shazamio_request_duration_seconds", "Time to the response headers of API requests.", ("endpoint",)
+)
+phase_seconds = Histogram(
+    "shazamio_phase_duration_seconds",
+    "Time spent per request phase (decode, signature, upstream, serialize).",
+    ("endpoint", "phase"),
+)
+upstream_requests_total = Counter(
+    "shazamio_upstream_requests_total",
+    "Shazam HTTP requests by endpoint and outcome (HTTP status or connection_error).",
+    ("endpoint", "outcome"),
+)
+recognitions_skipped_total = Counter(
+    "shazamio_recognitions_skipped_total",
+    "Recognitions the music gate skipped, by endpoint and reason (silence, noise, speech).",
+    ("endpoint", "reason"),
+)
+
+REGISTRY: List[Metric] = [
+    requests_total,
+    requests_in_flight,
+    request_seconds,
+    phase_seconds,
+    upstream_requests_total,
+    recognitions_skipped_total,
+]
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a phase of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_seconds.observe(time.perf_counter() - start, upstream_endpoint.get(), name)
+
+
+def render() -> bytes:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines += metric.header()
+        lines += metric.samples()
+    return ("\n".join(lines) + "\n").encode()
@@ -0,0 +1,67 @@
+"""Add-on options written by the Supervisor to /data/options.json."""
+import json
+import logging
+import os
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+OPTIONS_PATH = os.environ.get("SHAZAMIO_OPTIONS_PATH", "/data/options.json")
+# Persistent add-on storage (the Supervisor mounts it at /data)
+DATA_DIR = os.environ.get("SHAZAMIO_DATA_DIR", "/data")
+# Home Assistant folders mapped into the add-on (config.json "map"); the only
+# local files the API reads audio from
+MEDIA_ROOTS = tuple(os.environ.get("SHAZAMIO_MEDIA_ROOTS", "/media:/share").split(os.pathsep))
+
+# Defaults mirror the "options" block in config.json so the app also runs
+# outside the Supervisor (e.g. `docker run` during development).
+DEFAULT_OPTIONS: Dict[str, Any] = {
+    "log_level": "info",
+    "shazam_pool_size": 8,
+    "upstream_connection_limit": 20,
+    "upstream_rate_limit": 5.0,
+    "upstream_burst": 10,
+    "upstream_endpoint_rate_limits": [],
+    "upstream_retry_attempts": 4,
+    "upstream_retry_base_delay": 0.5,
+    "upstream_retry_max_delay": 10.0,
+    "upstream_error_threshold": 0.2,
+    "circuit_failure_threshold": 3,
+    "circuit_cooldown": 300,
+    "response_cache_size": 512,
+    "metadata_cache_ttl": 86400,
+    "chart_cache_ttl": 900,
+    "listening_counter_cache_ttl": 300,
+    "metadata_store": True,
+    "metadata_store_max_age_days": 30,
+    "max_audio_upload_mb": 50,
+    "recognition_concurrency": 2,
+    "recognition_queue_size": 16,
+    "signature_workers": 2,
+    "recognition_cache_size": 256,
+    "recognition_cache_ttl": 600,
+    "preprocess_audio": True,
+    "preprocess_window_seconds": 12,
+    "preprocess_window_selection": "loudest",
+    "music_gate": False,
+    "music_gate_min_level_dbfs": -50.0,
+    "music_gate_max_low_energy_ratio": 0.55,
+    "music_gate_max_spectral_flatness": 0.5,
+    "max_listeners": 4,
+    "recognition_history": True,
+    "history_retention_days": 0,
+    "history_store_payload": True,
+}
+
+
+def load_options() -> Dict[str, Any]:
+    """Load add-on options, falling back to defaults for missing keys."""
+    options = dict(DEFAULT_OPTIONS)
+    try:
+        with open(OPTIONS_PATH, encoding="utf-8") as f:
+            options.update(json.load(f))
+    except FileNotFoundError:
+        logger.info(f"No options file at {OPTIONS_PATH}, using defaults")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read options from {OPTIONS_PATH}: {e}, using defaults")
+    return options
@@ -0,0 +1,163 @@
+"""Reusable Shazam clients for the add-on."""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from aiohttp import ClientConnectionError, ClientResponseError, ClientSession, TCPConnector
+from shazamio import Shazam
+from shazamio.client import HTTPClient
+from shazamio.exceptions import BadMethod
+from shazamio.utils import validate_json
+
+from metrics import phase, upstream_requests_total
+from ratelimit import TRANSIENT_STATUSES, UpstreamRateLimiter, backoff_delay, upstream_endpoint
+
+logger = logging.getLogger(__name__)
+
+
+class SharedHTTPClient(HTTPClient):
+    """ShazamIO HTTP client that keeps one session open instead of one per request.
+
+    Each request is paced by the rate limiter and retried on transient
+    failures with jittered exponential backoff, replacing the library's
+    default of 20 unjittered retries.
+    """
+
+    def __init__(
+        self,
+        connection_limit: int = 20,
+        limiter: Optional[UpstreamRateLimiter] = None,
+        retry_attempts: int = 4,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 10.0,
+    ):
+        super().__init__()
+        self.connection_limit = connection_limit
+        self.limiter = limiter or UpstreamRateLimiter(rate=0, burst=1)
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._session: Optional[ClientSession] = None
+
+    def _get_session(self) -> ClientSession:
+        """Return the shared session, opening it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(connector=TCPConnector(limit=self.connection_limit))
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *args,
+        **kwargs,
+    ) -> Union[List[Any], Dict[str, Any]]:
+        if method.upper() not in ("GET", "POST"):
+            raise BadMethod("Accept only GET/POST")
+        # Includes rate limit waits and retries: the time the caller spends on upstream
+        with phase("upstream"):
+            return await self._request(method, url, *args, **kwargs)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *args,
+        **kwargs,
+    ) -> Union[List[Any], Dict[str, Any]]:
+        endpoint = upstream_endpoint.get()
+
+        attempt = 0
+        while True:
+            wait = self.limiter.reserve(endpoint)
+            if wait:
+                await asyncio.sleep(wait)
+
+            retry_after: Optional[float] = None
+            try:
+                async with self._get_session().request(method.upper(), url, **kwargs) as resp:
+                    upstream_requests_total.inc(endpoint, str(resp.status))
+                    if resp.status not in TRANSIENT_STATUSES:
+                        self.limiter.record(ok=True)
+                        return await validate_json(resp, *args)
+                    self.limiter.record(ok=False, throttled=resp.status == 429)
+                    if resp.status == 429 and resp.headers.get("Retry-After", "").isdigit():
+                        retry_after = float(resp.headers["Retry-After"])
+                    error: Exception = ClientResponseError(
+                        resp.request_info, resp.history, status=resp.status, message=resp.reason or ""
+                    )
+            except (ClientConnectionError, asyncio.TimeoutError) as e:
+                upstream_requests_total.inc(endpoint, "connection_error")
+                self.limiter.record(ok=False)
+                error = e
+
+            attempt += 1
+            if attempt >= self.retry_attempts:
+                logger.warning(f"Upstream {endpoint} request failed after {attempt} attempts: {error}")
+                raise error
+            self.limiter.retries += 1
+            delay = backoff_delay(attempt - 1, self.retry_base_delay, self.retry_max_delay)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.retry_max_delay))
+            logger.debug(f"Retrying upstream {endpoint} request in {delay:.2f}s ({error})")
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        """Close the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class ShazamPool:
+    """LRU registry of Shazam instances keyed by (language, endpoint_country).
+
+    All instances share a single SharedHTTPClient, so evicting an instance only
+    drops its recognizer and geo service; no connections are torn down.
+    """
+
+    def __init__(self, max_size: int = 8, connection_limit: int = 20, **http_options: Any):
+        self.max_size = max(1, max_size)
+        self.http_client = SharedHTTPClient(connection_limit=connection_limit, **http_options)
+        self._instances: "OrderedDict[Tuple[str, str], Shazam]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, language: str, endpoint_country: str) -> Shazam:
+        """Return a Shazam instance for the locale, creating it if needed."""
+        key = (language, endpoint_country)
+        shazam = self._instances.get(key)
+        if shazam is not None:
+            self.hits += 1
+            self._instances.move_to_end(key)
+            return shazam
+
+        self.misses += 1
+        shazam = Shazam(
+            language=language,
+            endpoint_country=endpoint_country,
+            http_client=self.http_client,
+        )
+        self._instances[key] = shazam
+        if len(self._instances) > self.max_size:
+            evicted, _ = self._instances.popitem(last=False)
+            self.evictions += 1
+            logger.debug(f"Evicted Shazam instance for {evicted}")
+        return shazam
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool usage counters."""
+        return {
+            "size": len(self._instances),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    async def close(self) -> None:
+        """Drop all instances and close the shared session."""
+        self._instances.clear()
+        await self.http_client.close()
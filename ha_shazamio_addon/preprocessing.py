@@ -0,0 +1,279 @@
+"""Audio preprocessing before fingerprinting.
+
+Recorders hand us minutes of 44.1/48 kHz stereo audio, but a recognition
+only needs a few seconds of 16 kHz mono. Before a signature is computed the
+audio is scanned once in blocks, scored per half second (loudness, or
+loudness weighted by how tonal the spectrum is), and only the best window
+is read back, downmixed and resampled. WAV files are streamed with the
+wave module; other formats are decoded to 16 kHz mono by ffmpeg first.
+
+The music gate then measures the audio that would be fingerprinted (its
+level, the share of low-energy frames typical of speech, and how noise-like
+its spectrum is) so silence, talk and hiss can be skipped without a
+signature or an upstream lookup.
+
+Everything here is synchronous and CPU-bound; it runs in the signature
+worker processes.
+"""
+import io
+import logging
+import subprocess
+import time
+import wave
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Format of the audio handed to Shazam: 16 kHz mono s16le
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # s16le
+
+# Scoring resolution
+FRAME_SECONDS = 0.5
+# Frames scored per block read from a WAV file (~32 s)
+FRAMES_PER_BLOCK = 64
+# Windowed-sinc low-pass taps used before downsampling
+LOWPASS_TAPS = 101
+
+# Music gate resolution, and the most audio it reads when preprocessing is off
+GATE_FRAME_SECONDS = 0.05
+GATE_MAX_SECONDS = 30
+
+SELECTION_LOUDEST = "loudest"
+SELECTION_MUSIC = "music"
+
+# Sample width (bytes) -> dtype and offset for PCM WAV data
+_WAV_DTYPES = {1: (np.uint8, 128.0), 2: (np.dtype("<i2"), 0.0), 4: (np.dtype("<i4"), 0.0)}
+
+
+def _to_mono(raw: bytes, channels: int, sample_width: int) -> np.ndarray:
+    """Decode interleaved PCM to mono float32 in [-1, 1]."""
+    dtype, offset = _WAV_DTYPES[sample_width]
+    samples = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+    if offset:
+        samples -= offset
+    samples /= float(2 ** (8 * sample_width - 1))
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def frame_scores(samples: np.ndarray, frame_length: int, selection: str = SELECTION_LOUDEST) -> np.ndarray:
+    """Score each whole frame of mono samples; higher is a better recognition candidate."""
+    count = len(samples) // frame_length
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[: count * frame_length].reshape(count, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    if selection != SELECTION_MUSIC:
+        return rms
+    # Spectral flatness is ~1 for noise and near 0 for tonal content
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame_length).astype(np.float32), axis=1)) + 1e-9
+    flatness = np.exp(np.mean(np.log(spectrum), axis=1)) / np.mean(spectrum, axis=1)
+    return rms * (1.0 - flatness)
+
+
+def best_window(scores: np.ndarray, window_frames: int) -> int:
+    """Index of the first frame of the window of window_frames frames with the highest total score."""
+    if len(scores) <= window_frames:
+        return 0
+    totals = np.cumsum(np.concatenate(([0.0], scores)))
+    return int(np.argmax(totals[window_frames:] - totals[:-window_frames]))
+
+
+def resample(samples: np.ndarray, rate: int, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Resample mono samples, low-pass filtering first when downsampling."""
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    if rate > target_rate:
+        cutoff = 0.45 * target_rate / rate  # cycles per input sample, just under the new Nyquist
+        n = np.arange(LOWPASS_TAPS) - (LOWPASS_TAPS - 1) / 2
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(LOWPASS_TAPS)
+        samples = np.convolve(samples, (taps / taps.sum()).astype(np.float32), mode="same")
+    positions = np.arange(int(len(samples) * target_rate / rate)) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    """Wrap 16 kHz mono s16le PCM in a WAV container."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(SAMPLE_WIDTH)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+def _to_wav(samples: np.ndarray) -> bytes:
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    return pcm_to_wav(pcm.tobytes())
+
+
+def _wav_window(source: Union[str, io.BytesIO], window_seconds: float, selection: str) -> Optional[bytes]:
+    """Best window of a PCM WAV file as 16 kHz mono WAV, or None if the input is already that small."""
+    with wave.open(source, "rb") as w:
+        channels, sample_width, rate, total = w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()
+        if sample_width not in _WAV_DTYPES:
+            raise ValueError(f"Unsupported WAV sample width {sample_width}")
+        if total == 0:
+            # Streamed to a pipe (arecord, ffmpeg to stdout): the header never got its data size
+            raise ValueError("WAV header has no data size")
+        window_length = int(window_seconds * rate)
+        if channels == 1 and rate <= SAMPLE_RATE and total <= window_length:
+            return None
+
+        frame_length = int(FRAME_SECONDS * rate)
+        scores = []
+        while True:
+            raw = w.readframes(frame_length * FRAMES_PER_BLOCK)
+            if not raw:
+                break
+            scores.append(frame_scores(_to_mono(raw, channels, sample_width), frame_length, selection))
+        start = best_window(np.concatenate(scores), int(window_seconds / FRAME_SECONDS)) if scores else 0
+
+        w.setpos(start * frame_length)
+        window = _to_mono(w.readframes(window_length), channels, sample_width)
+    if window.size == 0:
+        raise ValueError("WAV has no readable samples")
+    return _to_wav(resample(window, rate))
+
+
+def _decoded_window(data: Union[str, bytes, bytearray], window_seconds: float, selection: str) -> bytes:
+    """Best window of any format ffmpeg can read, as 16 kHz mono WAV."""
+    source = data if isinstance(data, str) else "pipe:0"
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", source, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"],
+        input=None if isinstance(data, str) else bytes(data),
+        stdin=subprocess.DEVNULL if isinstance(data, str) else None,
+        capture_output=True,
+        check=True,
+    )
+    samples = _to_mono(result.stdout, 1, 2)
+    frame_length = int(FRAME_SECONDS * SAMPLE_RATE)
+    start = best_window(frame_scores(samples, frame_length, selection), int(window_seconds / FRAME_SECONDS))
+    return _to_wav(samples[start * frame_length: start * frame_length + int(window_seconds * SAMPLE_RATE)])
+
+
+def _is_wav(data: Union[str, bytes, bytearray]) -> bool:
+    if isinstance(data, str):
+        with open(data, "rb") as f:
+            header = f.read(12)
+    else:
+        header = bytes(data[:12])
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def preprocess_audio(
+    data: Union[str, bytes, bytearray],
+    window_seconds: float = 12.0,
+    selection: str = SELECTION_LOUDEST,
+) -> Union[str, bytes, bytearray]:
+    """Return the best window_seconds of audio as 16 kHz mono WAV bytes.
+
+    The input is returned unchanged when it is already a short 16 kHz (or
+    lower) mono WAV, or when it can't be preprocessed; the fingerprinter
+    then decodes it as before.
+    """
+    try:
+        if _is_wav(data):
+            try:
+                window = _wav_window(data if isinstance(data, str) else io.BytesIO(data), window_seconds, selection)
+                return data if window is None else window
+            except (wave.Error, ValueError, EOFError):
+                pass  # e.g. float, extensible or streamed WAV; let ffmpeg decode it
+        return _decoded_window(data, window_seconds, selection)
+    except Exception as e:
+        logger.warning(f"Audio preprocessing failed, fingerprinting the original audio: {e}")
+        return data
+
+
+class NoMusicError(Exception):
+    """The music gate found nothing worth recognizing in the audio."""
+
+    def __init__(self, reason: str, levels: Dict[str, Any]):
+        super().__init__(reason, levels)
+        self.reason = reason
+        self.levels = levels
+
+    def __str__(self) -> str:
+        return f"No music detected ({self.reason})"
+
+
+@dataclass(frozen=True)
+class MusicGate:
+    """Thresholds outside which audio is skipped instead of recognized."""
+
+    min_level_dbfs: float = -50.0
+    max_low_energy_ratio: float = 0.55
+    max_spectral_flatness: float = 0.5
+
+    def reason(self, levels: Dict[str, Any]) -> Optional[str]:
+        """Why audio with these levels should be skipped, or None to recognize it."""
+        if levels["level_dbfs"] < self.min_level_dbfs:
+            return "silence"
+        if levels["spectral_flatness"] > self.max_spectral_flatness:
+            return "noise"
+        if levels["low_energy_ratio"] > self.max_low_energy_ratio:
+            return "speech"
+        return None
+
+
+def audio_levels(samples: np.ndarray, rate: int) -> Dict[str, float]:
+    """Measure mono samples for the music gate.
+
+    level_dbfs is the overall RMS level. low_energy_ratio is the share of
+    50 ms frames quieter than half the mean frame level: speech pauses
+    between syllables and words, while music rarely drops out. spectral_flatness
+    is the median power-spectrum flatness of the louder frames: near 0 for
+    tonal audio, about 0.56 for white noise.
+    """
+    frame_length = max(1, int(GATE_FRAME_SECONDS * rate))
+    count = len(samples) // frame_length
+    if count == 0:
+        return {"level_dbfs": -120.0, "low_energy_ratio": 1.0, "spectral_flatness": 1.0}
+    frames = samples[: count * frame_length].reshape(count, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    level = float(np.sqrt(np.mean(rms * rms)))
+    loud = rms >= 0.5 * rms.mean()
+    power = np.abs(np.fft.rfft(frames[loud] * np.hanning(frame_length).astype(np.float32), axis=1)) ** 2 + 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return {
+        "level_dbfs": round(20 * np.log10(max(level, 1e-6)), 1),
+        "low_energy_ratio": round(1.0 - float(loud.mean()), 3),
+        "spectral_flatness": round(float(np.median(flatness)) if len(flatness) else 1.0, 3),
+    }
+
+
+def check_music(data: Union[str, bytes, bytearray], gate: MusicGate) -> Optional[Dict[str, Any]]:
+    """Measure WAV audio and raise NoMusicError if the gate rejects it.
+
+    Returns the measurements, or None for audio the gate can't read (other
+    formats when preprocessing is off, truncated or streamed WAVs), which
+    is always recognized.
+    """
+    start = time.perf_counter()
+    try:
+        if not _is_wav(data):
+            return None
+        with wave.open(data if isinstance(data, str) else io.BytesIO(data), "rb") as w:
+            channels, sample_width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+            if sample_width not in _WAV_DTYPES:
+                return None
+            samples = _to_mono(w.readframes(int(GATE_MAX_SECONDS * rate)), channels, sample_width)
+    except (OSError, wave.Error, EOFError, ValueError) as e:
+        logger.debug(f"Music gate could not read audio, recognizing it anyway: {e}")
+        return None
+    if samples.size == 0:
+        # e.g. a streamed WAV without a data size; not evidence of silence
+        return None
+
+    levels: Dict[str, Any] = audio_levels(samples, rate)
+    levels["check_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    reason = gate.reason(levels)
+    if reason is not None:
+        raise NoMusicError(reason, levels)
+    return levels
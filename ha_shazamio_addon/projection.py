@@ -0,0 +1,93 @@
+"""Field projection for large metadata responses.
+
+Chart and search payloads carry the full upstream object for every track,
+while most automations only need a title, an artist and a cover. A
+projection is a list of dotted paths (e.g. "attributes.artwork.url") that
+is applied to every track-like object in the response: objects containing
+one of the requested keys keep only the requested paths, other containers
+(the "data", "tracks" or "hits" wrappers) are walked through unchanged, so
+the response keeps its shape and loses everything else.
+"""
+from typing import Any, Dict, List, Optional, Union
+
+# Paths for "slim": the minimum an automation needs from both the Shazam
+# (key/title/subtitle) and Apple Music (id/attributes) track shapes
+SLIM_FIELDS = [
+    "key",
+    "title",
+    "subtitle",
+    "images.coverart",
+    "url",
+    "id",
+    "attributes.name",
+    "attributes.artistName",
+    "attributes.albumName",
+    "attributes.artwork.url",
+    "attributes.url",
+]
+
+PRESETS = {"slim": SLIM_FIELDS}
+
+Fields = Union[str, List[str], None]
+
+# Nested path tree: {"attributes": {"name": {}, "artwork": {"url": {}}}}
+PathTree = Dict[str, "PathTree"]
+
+
+def parse_fields(fields: Fields) -> Optional[List[str]]:
+    """Normalise a fields value (list, comma-separated string or preset name) to dotted paths."""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    paths: List[str] = []
+    for field in fields:
+        field = field.strip()
+        if field in PRESETS:
+            paths.extend(PRESETS[field])
+        elif field:
+            paths.append(field)
+    return paths or None
+
+
+def _path_tree(paths: List[str]) -> PathTree:
+    tree: PathTree = {}
+    for path in paths:
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _select(obj: Any, tree: PathTree) -> Any:
+    # A leaf keeps the value whole; otherwise keep only the requested children
+    if not tree:
+        return obj
+    if isinstance(obj, list):
+        return [_select(item, tree) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    return {key: _select(obj[key], subtree) for key, subtree in tree.items() if key in obj}
+
+
+def _project(obj: Any, tree: PathTree) -> Any:
+    if isinstance(obj, list):
+        return [_project(item, tree) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if any(key in obj for key in tree):
+        return _select(obj, tree)
+    # Container around the items: keep walking, drop scalars like "next" links
+    return {
+        key: _project(value, tree)
+        for key, value in obj.items()
+        if isinstance(value, (dict, list))
+    }
+
+
+def project(data: Any, fields: Fields) -> Any:
+    """Trim a JSON-compatible response down to the requested fields."""
+    paths = parse_fields(fields)
+    if paths is None:
+        return data
+    return _project(data, _path_tree(paths))
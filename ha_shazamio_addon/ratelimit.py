@@ -0,0 +1,161 @@
+"""Rate limiting and retry policy for upstream Shazam requests.
+
+Every upstream HTTP request takes a token from a global bucket and from the
+bucket of the add-on endpoint it serves. When the recent share of transient
+failures (429, 5xx, connection errors) rises above a threshold, all bucket
+rates are scaled down, then recover gradually as requests succeed again.
+"""
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Add-on endpoint the current upstream request serves, set per API request
+upstream_endpoint: ContextVar[str] = ContextVar("upstream_endpoint", default="other")
+
+# Responses worth retrying; anything else is returned or raised as-is
+TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_endpoint_rates(entries: List[str]) -> Dict[str, float]:
+    """Parse "endpoint=rate" option entries into a budget per endpoint."""
+    rates: Dict[str, float] = {}
+    for entry in entries or []:
+        endpoint, _, rate = str(entry).partition("=")
+        try:
+            rates[endpoint.strip()] = float(rate)
+        except ValueError:
+            logger.warning(f"Ignoring endpoint rate limit {entry!r}, expected endpoint=requests_per_second")
+    return rates
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Full-jitter exponential backoff: a random delay up to base * 2**attempt."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    A request that finds the bucket empty still takes a token (driving the
+    balance negative) and is told how long to wait, so concurrent callers
+    queue up in order without a lock.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.waits = 0
+
+    def reserve(self, factor: float = 1.0) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        rate = self.rate * factor
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        self.waits += 1
+        return -self.tokens / rate
+
+
+class UpstreamRateLimiter:
+    """Global and per-endpoint token buckets with adaptive slowdown."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        endpoint_rates: Optional[Dict[str, float]] = None,
+        error_threshold: float = 0.2,
+        window_seconds: float = 60.0,
+        min_samples: int = 10,
+        min_factor: float = 0.25,
+    ):
+        self.global_bucket = TokenBucket(rate, burst)
+        self.endpoint_buckets = {
+            endpoint: TokenBucket(endpoint_rate, max(1.0, endpoint_rate))
+            for endpoint, endpoint_rate in (endpoint_rates or {}).items()
+        }
+        self.error_threshold = error_threshold
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.min_factor = min_factor
+        self.factor = 1.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failed_in_window = 0
+        self._last_slowdown = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.slowdowns = 0
+
+    def reserve(self, endpoint: str) -> float:
+        """Take tokens for one upstream request; return the seconds to wait."""
+        self.requests += 1
+        wait = self.global_bucket.reserve(self.factor)
+        bucket = self.endpoint_buckets.get(endpoint)
+        if bucket is not None:
+            wait = max(wait, bucket.reserve(self.factor))
+        return wait
+
+    def error_rate(self) -> float:
+        """Share of transient failures among upstream attempts in the window."""
+        cutoff = time.monotonic() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            _, ok = self._outcomes.popleft()
+            if not ok:
+                self._failed_in_window -= 1
+        if not self._outcomes:
+            return 0.0
+        return self._failed_in_window / len(self._outcomes)
+
+    def record(self, ok: bool, throttled: bool = False) -> None:
+        """Record an attempt's outcome and adapt the rate factor.
+
+        Rates are halved (at most once per second) when a failure arrives
+        while the error rate is over the threshold or upstream answers 429,
+        and creep back up by 5% per success once the error rate is under
+        half the threshold.
+        """
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        if not ok:
+            self.failures += 1
+            self._failed_in_window += 1
+        error_rate = self.error_rate()
+
+        too_many_errors = (
+            not ok and len(self._outcomes) >= self.min_samples and error_rate > self.error_threshold
+        )
+        if (throttled or too_many_errors) and now - self._last_slowdown >= 1.0:
+            self.factor = max(self.min_factor, self.factor / 2)
+            self._last_slowdown = now
+            self.slowdowns += 1
+        elif ok and self.factor < 1.0 and error_rate < self.error_threshold / 2:
+            self.factor = min(1.0, self.factor + 0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limiter counters."""
+        return {
+            "rate": self.global_bucket.rate,
+            "factor": round(self.factor, 3),
+            "error_rate": round(self.error_rate(), 3),
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "slowdowns": self.slowdowns,
+            "waits": {
+                "global": self.global_bucket.waits,
+                **{endpoint: bucket.waits for endpoint, bucket in self.endpoint_buckets.items()},
+            },
+        }
@@ -0,0 +1,93 @@
+"""Bounded-concurrency scheduler for recognition jobs."""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+
+class QueueFullError(Exception):
+    """Raised when a job arrives while the wait queue is already full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Recognition queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RecognitionScheduler:
+    """Run at most max_concurrency jobs at once with a bounded FIFO wait queue.
+
+    Backlog jobs (batches) can wait outside the queue limit instead of being
+    rejected; they still take slots in arrival order.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 16):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._backlog = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up."""
+        avg_run = self.total_run / self.completed if self.completed else 5.0
+        backlog = (self._waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(avg_run * backlog))
+
+    @asynccontextmanager
+    async def slot(self, wait: bool = False) -> AsyncIterator[None]:
+        """Wait for a free slot, or raise QueueFullError if the queue is full.
+
+        With wait=True the job always waits, however long the queue is.
+        """
+        if not wait and self._semaphore.locked() and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(self._retry_after())
+
+        queued_at = time.monotonic()
+        if wait:
+            self._backlog += 1
+        else:
+            self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            if wait:
+                self._backlog -= 1
+            else:
+                self._waiting -= 1
+
+        started_at = time.monotonic()
+        wait = started_at - queued_at
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self._running += 1
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self.completed += 1
+            self.total_run += time.monotonic() - started_at
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and wait/run time statistics."""
+        started = self.completed + self._running
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued": self._waiting,
+            "backlog": self._backlog,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.total_wait / started, 3) if started else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+            "avg_run_seconds": round(self.total_run / self.completed, 3) if self.completed else 0.0,
+        }
@@ -0,0 +1,74 @@
+"""Response serialization for the add-on API.
+
+Shazam responses are already JSON-shaped dicts and lists, or (for a few
+calls) dataclasses. Dataclass dumpers are compiled once per type and reused,
+and bodies are encoded with orjson. Routes that return a JSONBytesResponse
+skip FastAPI's response-model validation and re-encoding entirely, which is
+what makes large chart payloads cheap to serve from the cache.
+"""
+import logging
+from dataclasses import is_dataclass
+from typing import Any, Callable, Dict
+
+import orjson
+from dataclass_factory import Factory
+from fastapi.responses import Response
+
+from metrics import phase
+
+logger = logging.getLogger(__name__)
+
+factory = Factory()
+
+# Compiled dumper per response type, built on first use
+_dumpers: Dict[type, Callable[[Any], Any]] = {}
+
+
+def _compile_dumper(cls: type) -> Callable[[Any], Any]:
+    if is_dataclass(cls):
+        return factory.serializer(cls)
+    if hasattr(cls, "__dict__"):
+        return lambda obj: factory.dump(obj, Dict[str, Any])
+    return dict
+
+
+def serialize_response(obj: Any) -> Any:
+    """Convert a ShazamIO response object to JSON-compatible data."""
+    if isinstance(obj, (dict, list)):
+        return obj
+    cls = type(obj)
+    dumper = _dumpers.get(cls)
+    if dumper is None:
+        dumper = _dumpers[cls] = _compile_dumper(cls)
+    try:
+        return dumper(obj)
+    except Exception as e:
+        logger.warning(f"Could not serialize response: {e}, returning as-is")
+        return {"raw_response": str(obj)}
+
+
+def _default(obj: Any) -> Any:
+    # Anything orjson can't encode natively (e.g. enums from shazamio schemas)
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode JSON-compatible data to a UTF-8 JSON body."""
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def loads(body: bytes) -> Any:
+    """Decode a JSON body produced by dumps()."""
+    return orjson.loads(body)
+
+
+class JSONBytesResponse(Response):
+    """JSON response that sends pre-encoded bodies as-is and encodes anything else with orjson."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with phase("serialize"):
+            return dumps(content)
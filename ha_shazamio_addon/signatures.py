@@ -0,0 +1,194 @@
+"""Audio signature generation in worker processes.
+
+Decoding audio and computing its fingerprint is CPU-bound. Running it in a
+process pool keeps the event loop free for other requests; only the small
+signature comes back to be sent upstream. When preprocessing is on, the
+worker first cuts the audio down to its best window (see preprocessing.py).
+With a music gate, the worker then raises NoMusicError instead of computing
+a signature for silence, speech or noise.
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+
+from shazamio_core import Recognizer
+
+from preprocessing import MusicGate, NoMusicError, check_music, preprocess_audio
+
+logger = logging.getLogger(__name__)
+
+# Matches the Shazam() default
+SEGMENT_DURATION_SECONDS = 10
+
+
+class SignatureComputeError(Exception):
+    """Audio could not be decoded or fingerprinted in a worker process."""
+
+
+@dataclass(frozen=True)
+class SignatureSong:
+    uri: str
+    samples: int
+
+
+@dataclass(frozen=True)
+class ComputedSignature:
+    """Picklable stand-in for shazamio_core.Signature.
+
+    Carries the fields Shazam.send_recognize_request_v2() reads.
+    """
+
+    signature: SignatureSong
+    timestamp: int
+
+
+# Per-worker state, set up once by _init_worker
+_recognizer: Optional[Recognizer] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_preprocess: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(segment_duration_seconds: int, preprocess: Optional[Dict[str, Any]]) -> None:
+    global _recognizer, _loop, _preprocess
+    _recognizer = Recognizer(segment_duration_seconds=segment_duration_seconds)
+    _loop = asyncio.new_event_loop()
+    _preprocess = preprocess
+
+
+async def _recognize(recognizer: Recognizer, data: Union[str, bytes, bytearray]) -> Any:
+    # The Rust bindings need a running loop when the call is made, not just
+    # when it is awaited
+    if isinstance(data, str):
+        return await recognizer.recognize_path(value=data)
+    return await recognizer.recognize_bytes(value=data)
+
+
+def _prepare(
+    data: Union[str, bytes, bytearray],
+    preprocess: Optional[Dict[str, Any]],
+    gate: Optional[MusicGate],
+) -> Union[str, bytes, bytearray]:
+    """Preprocess audio and run the music gate over it; raises NoMusicError."""
+    if preprocess is not None:
+        data = preprocess_audio(data, **preprocess)
+    if gate is not None:
+        check_music(data, gate)
+    return data
+
+
+def _compute_in_worker(data: Union[str, bytes, bytearray], gate: Optional[MusicGate]) -> Tuple[str, int, int]:
+    """Decode audio and compute its signature inside a worker process."""
+    data = _prepare(data, _preprocess, gate)
+    try:
+        sig = _loop.run_until_complete(_recognize(_recognizer, data))
+    except Exception as e:
+        # shazamio_core exceptions can't be pickled back to the parent
+        raise SignatureComputeError(f"{type(e).__name__}: {e}") from None
+    return sig.signature.uri, sig.signature.samples, sig.timestamp
+
+
+def audio_digest(data: Union[str, bytes, bytearray]) -> str:
+    """Return a cache key for audio: a hash of raw bytes, or path identity for files.
+
+    Hashing releases the GIL, so callers can run this in a thread for large clips.
+    """
+    if isinstance(data, str):
+        stat = os.stat(data)
+        return f"path:{data}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def signature_digest(signature: Any) -> str:
+    """Return a cache key for a computed signature.
+
+    Different encodings of the same audio produce the same signature, so this
+    catches duplicates that the raw byte hash misses.
+    """
+    return hashlib.blake2b(signature.signature.uri.encode(), digest_size=16).hexdigest()
+
+
+class SignatureWorkers:
+    """Compute audio signatures in a process pool, or in-process when workers=0.
+
+    preprocess holds preprocess_audio() keyword arguments, or None to
+    fingerprint audio as given. compute() takes an optional MusicGate.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        segment_duration_seconds: int = SEGMENT_DURATION_SECONDS,
+        preprocess: Optional[Dict[str, Any]] = None,
+    ):
+        self.workers = max(0, workers)
+        self.computed = 0
+        self.gated = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._recognizer: Optional[Recognizer] = None
+        self._segment_duration_seconds = segment_duration_seconds
+        self._preprocess = preprocess
+        if self.workers:
+            self._executor = self._create_executor()
+        else:
+            self._recognizer = Recognizer(segment_duration_seconds=segment_duration_seconds)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that already runs the event loop and
+        # aiohttp threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._segment_duration_seconds, self._preprocess),
+        )
+
+    async def compute(self, data: Union[str, bytes, bytearray], gate: Optional[MusicGate] = None) -> Any:
+        """Return the signature for an audio file path or raw audio bytes.
+
+        Raises NoMusicError when gate rejects the audio.
+        """
+        self.computed += 1
+        if self._executor is None:
+            if self._preprocess is not None or gate is not None:
+                try:
+                    data = await asyncio.to_thread(_prepare, data, self._preprocess, gate)
+                except NoMusicError:
+                    self.gated += 1
+                    raise
+            return await _recognize(self._recognizer, data)
+
+        loop = asyncio.get_running_loop()
+        try:
+            uri, samples, timestamp = await loop.run_in_executor(
+                self._executor, _compute_in_worker, data, gate
+            )
+        except NoMusicError:
+            self.gated += 1
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. decoder crash or OOM); start a fresh pool
+            # for later jobs and report this one as failed
+            logger.error("Signature worker pool broke, restarting it")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            raise
+        return ComputedSignature(
+            signature=SignatureSong(uri=uri, samples=samples),
+            timestamp=timestamp,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker pool counters."""
+        return {"workers": self.workers, "computed": self.computed, "gated": self.gated, "preprocess": self._preprocess}
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
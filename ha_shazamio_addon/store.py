@@ -0,0 +1,116 @@
+"""Persistent SQLite store for track, artist and album metadata.
+
+Responses are kept in the add-on's /data volume, indexed by kind and Shazam
+ID, so metadata survives restarts. Each row is one response variant: the
+same ID can be stored for several locales or query options. Payloads are
+stored as the encoded JSON body that is sent to clients.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    kind TEXT NOT NULL,
+    shazam_id INTEGER NOT NULL,
+    variant TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, shazam_id, variant)
+);
+CREATE INDEX IF NOT EXISTS metadata_fetched_at ON metadata (fetched_at);
+"""
+
+
+class MetadataStore:
+    """Thread-safe SQLite store; async methods run queries in a worker thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+
+    @classmethod
+    def open(cls, data_dir: str, filename: str = "metadata.db") -> Optional["MetadataStore"]:
+        """Open the store in data_dir, or return None if it is not writable."""
+        if not os.path.isdir(data_dir):
+            logger.warning(f"Data directory {data_dir} does not exist, metadata store disabled")
+            return None
+        try:
+            return cls(os.path.join(data_dir, filename))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open metadata store in {data_dir}: {e}")
+            return None
+
+    def _get(self, kind: str, shazam_id: int, variant: str) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM metadata WHERE kind = ? AND shazam_id = ? AND variant = ?",
+                (kind, shazam_id, variant),
+            ).fetchone()
+        if row is None:
+            return None
+        payload = row[0]
+        # Rows written by older versions hold JSON text rather than bytes
+        return (payload.encode() if isinstance(payload, str) else payload), row[1]
+
+    def _put(self, kind: str, shazam_id: int, variant: str, payload: bytes) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (kind, shazam_id, variant, payload, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, shazam_id, variant, payload, time.time()),
+            )
+
+    def _prune(self, max_age: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM metadata WHERE fetched_at < ?", (time.time() - max_age,)
+            )
+        return cursor.rowcount
+
+    async def get(self, kind: str, shazam_id: int, variant: str) -> Optional[Tuple[bytes, float]]:
+        """Return (JSON body, age_seconds) or None."""
+        self.reads += 1
+        row = await asyncio.to_thread(self._get, kind, shazam_id, variant)
+        if row is None:
+            return None
+        self.hits += 1
+        payload, fetched_at = row
+        return payload, time.time() - fetched_at
+
+    async def put(self, kind: str, shazam_id: int, variant: str, payload: bytes) -> None:
+        """Insert or replace a response's JSON body."""
+        self.writes += 1
+        await asyncio.to_thread(self._put, kind, shazam_id, variant, payload)
+
+    async def prune(self, max_age: float) -> int:
+        """Delete rows older than max_age seconds; return how many were removed."""
+        return await asyncio.to_thread(self._prune, max_age)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return store counters."""
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, COUNT(*) FROM metadata GROUP BY kind").fetchall()
+        return {
+            "path": self.path,
+            "rows": dict(rows),
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()